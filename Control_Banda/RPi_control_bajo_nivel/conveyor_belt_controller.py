@@ -382,8 +382,10 @@ class PWMDriver(BeltDriver):
 class ConveyorBeltController:
     """Controlador avanzado de banda transportadora con recuperación automática."""
     
-    def __init__(self, config_file: str = 'Control_Banda/config_industrial.json'):
+    def __init__(self, config_file: str = 'Control_Banda/config_industrial.json',
+                 config_data: Optional[Dict[str, Any]] = None):
         self.config_file = config_file
+        self._config_data = config_data  # Configuración ya parseada (opcional)
         self.logger = logging.getLogger(f"{__name__}.Controller")
         
         # Estado interno
@@ -435,12 +437,15 @@ class ConveyorBeltController:
     async def _load_configuration(self) -> bool:
         """Cargar configuración desde archivo."""
         try:
-            if not os.path.exists(self.config_file):
-                self.logger.error(f"Archivo de configuración no encontrado: {self.config_file}")
-                return False
+            if self._config_data is not None:
+                full_config = self._config_data
+            else:
+                if not os.path.exists(self.config_file):
+                    self.logger.error(f"Archivo de configuración no encontrado: {self.config_file}")
+                    return False
                 
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                full_config = json.load(f)
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    full_config = json.load(f)
                 
             belt_config = full_config.get('conveyor_belt_settings', {})
             if not belt_config:
@@ -896,6 +901,19 @@ def load_belt_config(config_file='Control_Banda/config_industrial.json'):
         logger.error(f"Error en load_belt_config legacy: {e}")
         return False
 
+def load_belt_config_from_dict(config_data):
+    """Función legacy para cargar configuración ya parseada (sin releer el archivo)."""
+    global _controller_instance
+    try:
+        _controller_instance = ConveyorBeltController(config_data=config_data)
+        success = _run_async(_controller_instance.initialize())
+        if success:
+            logger.info("Configuración de banda cargada (legacy API)")
+        return success
+    except Exception as e:
+        logger.error(f"Error en load_belt_config_from_dict legacy: {e}")
+        return False
+
 def setup_belt_gpio():
     """Función legacy para configurar GPIO."""
     # La nueva implementación hace esto automáticamente en initialize()
@@ -906,6 +924,14 @@ def setup_belt_gpio():
         logger.error("Controlador no inicializado. Ejecute load_belt_config() primero")
         return False
 
+def get_claimed_pins():
+    """Función legacy: pines GPIO configurados por el driver de la banda."""
+    if not _controller_instance or not _controller_instance.driver or not _controller_instance.driver._initialized:
+        return []
+    config = _controller_instance.config
+    pins = (config.motor_pin_bcm, config.enable_pin_bcm, config.direction_pin_bcm)
+    return [pin for pin in pins if pin is not None]
+
 def start_belt(speed_percent=None):
     """Función legacy para iniciar banda."""
     if not _controller_instance:
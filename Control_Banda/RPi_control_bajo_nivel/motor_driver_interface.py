@@ -152,6 +152,10 @@ class BaseActuator(ABC):
         """Verifica si el actuador está inicializado"""
         return self._initialized
     
+    def get_claimed_pins(self) -> List[int]:
+        """Pines GPIO configurados por el actuador (vacío si no se inicializó)"""
+        return []
+    
     def _log_error(self, error_msg: str) -> None:
         """Registra un error del actuador"""
         self.status.error_count += 1
@@ -198,6 +202,16 @@ class StepperActuator(BaseActuator):
             self._log_error(f"Error inicializando motor paso a paso: {e}")
             return False
     
+    def get_claimed_pins(self) -> List[int]:
+        """Pines GPIO configurados por el motor paso a paso"""
+        if not self._initialized:
+            return []
+        pins = [self.config['dir_pin_bcm'], self.config['step_pin_bcm']]
+        enable_pin = self.config.get('enable_pin_bcm')
+        if enable_pin is not None and self.config.get('use_enable_pin', True):
+            pins.append(enable_pin)
+        return pins
+    
     def activate(self, duration_s: float = 1.0) -> bool:
         """Activa el motor por la duración especificada"""
         if not self._initialized:
@@ -390,6 +404,10 @@ class OnOffActuator(BaseActuator):
             self._log_error(f"Error inicializando actuador ON/OFF: {e}")
             return False
     
+    def get_claimed_pins(self) -> List[int]:
+        """Pin GPIO configurado por el actuador ON/OFF"""
+        return [self.config['pin_bcm']] if self._initialized else []
+    
     def activate(self, duration_s: float = 1.0) -> bool:
         """Activa el actuador por la duración especificada"""
         if not self._initialized:
@@ -484,6 +502,15 @@ class DiverterManager:
             with open(config_file, 'r', encoding='utf-8') as f:
                 config_data = json.load(f)
             
+        except Exception as e:
+            logger.error(f"Error cargando configuración: {e}")
+            return False
+        
+        return self.load_configuration_from_dict(config_data)
+    
+    def load_configuration_from_dict(self, config_data: Dict[str, Any]) -> bool:
+        """Carga la configuración de los desviadores desde un diccionario ya parseado"""
+        try:
             if 'diverter_control_settings' not in config_data:
                 logger.error("'diverter_control_settings' no encontrado en configuración")
                 return False
@@ -577,6 +604,10 @@ class DiverterManager:
         """Obtiene el estado de todos los desviadores"""
         return {name: actuator.get_status() for name, actuator in self.actuators.items()}
     
+    def get_claimed_pins(self) -> List[int]:
+        """Pines GPIO configurados por todos los actuadores inicializados"""
+        return sorted({pin for actuator in self.actuators.values() for pin in actuator.get_claimed_pins()})
+    
     def stop_all(self) -> bool:
         """Detiene todos los desviadores"""
         success = True
@@ -608,6 +639,11 @@ def load_diverter_configuration(config_file: str = 'Control_Banda/config_industr
     return _diverter_manager.load_configuration(config_file)
 
 
+def load_diverter_configuration_from_dict(config_data: Dict[str, Any]) -> bool:
+    """Función de compatibilidad: carga configuración de desviadores ya parseada"""
+    return _diverter_manager.load_configuration_from_dict(config_data)
+
+
 def setup_diverter_gpio() -> bool:
     """Función de compatibilidad: configura GPIOs de desviadores"""
     return _diverter_manager.initialize_all()
@@ -623,6 +659,11 @@ def cleanup_gpio_diverters() -> None:
     _diverter_manager.cleanup_all()
 
 
+def get_claimed_pins() -> List[int]:
+    """Función de compatibilidad: pines GPIO configurados por los desviadores"""
+    return _diverter_manager.get_claimed_pins()
+
+
 def get_diverter_manager() -> DiverterManager:
     """Obtiene la instancia del gestor de desviadores"""
     return _diverter_manager
@@ -18,7 +18,9 @@ import time
 import logging
 import json
 import os
+import select
 import statistics
+import sys
 
 # Obtener logger (configurado en el script principal)
 logger = logging.getLogger(__name__)
@@ -26,6 +28,7 @@ logger = logging.getLogger(__name__)
 # --- Variables Globales del Módulo ---
 config_data = {} # Contendrá toda la sección de sensores del config
 camera_trigger_config = {}
+emergency_stop_config = {}
 bin_level_common_config = {}
 bin_specific_configs = {} # { "CategoryName": {config_details}, ... }
 
@@ -36,12 +39,16 @@ current_sound_speed_cm_s = 34300.0 # cm/s a 20°C
 # Caché para niveles de llenado para evitar lecturas fallidas consecutivas
 bin_fill_level_cache = {}
 
+# Pines GPIO efectivamente configurados por este módulo
+claimed_pins = set()
+
+# Pines con detección por flanco registrada (se liberan en cleanup_sensor_gpio)
+edge_detect_pins = set()
+
 def load_sensor_config(config_file='Control_Banda/config_industrial.json'):
     """
     Carga la configuración de todos los sensores desde el archivo JSON.
     """
-    global config_data, camera_trigger_config, bin_level_common_config, \
-           bin_specific_configs, current_temperature_c, current_sound_speed_cm_s
     try:
         if not os.path.exists(config_file):
             logger.error(f"Archivo de configuración {config_file} no encontrado.")
@@ -50,6 +57,20 @@ def load_sensor_config(config_file='Control_Banda/config_industrial.json'):
         with open(config_file, 'r') as f:
             full_config = json.load(f)
         
+    except Exception as e:
+        logger.error(f"Error cargando la configuración de sensores: {e}", exc_info=True)
+        return False
+    
+    return load_sensor_config_from_dict(full_config)
+
+def load_sensor_config_from_dict(full_config):
+    """
+    Carga la configuración de todos los sensores desde un diccionario ya parseado
+    (evita volver a leer el archivo JSON cuando el llamador ya lo tiene en memoria).
+    """
+    global config_data, camera_trigger_config, emergency_stop_config, bin_level_common_config, \
+           bin_specific_configs, current_temperature_c, current_sound_speed_cm_s
+    try:
         if 'sensors_settings' not in full_config:
             logger.error("'sensors_settings' no encontrado en el archivo de configuración.")
             return False
@@ -63,6 +84,11 @@ def load_sensor_config(config_file='Control_Banda/config_industrial.json'):
         else:
             logger.info(f"Configuración de sensor de disparo de cámara cargada: {camera_trigger_config}")
 
+        # Cargar configuración del botón de parada de emergencia
+        emergency_stop_config = config_data.get('safety', {}).get('emergency_stop', {})
+        if emergency_stop_config.get('enabled', False) and emergency_stop_config.get('pin_bcm') is not None:
+            logger.info(f"Configuración de parada de emergencia cargada: {emergency_stop_config}")
+        
         # Cargar configuración de sensores de nivel de tolva
         bin_sensors_config = config_data.get('bin_level_sensors', {})
         bin_level_common_config = bin_sensors_config.get('settings_common', {
@@ -123,8 +149,16 @@ def setup_sensor_gpio():
                 pud = GPIO.PUD_DOWN
             
             GPIO.setup(pin, GPIO.IN, pull_up_down=pud)
+            claimed_pins.add(pin)
             logger.info(f"GPIO {pin} (Sensor Disparo Cámara) configurado como ENTRADA (pull: {pull_up_down_str}).")
 
+        # Configurar botón de parada de emergencia (contacto a GND con pull-up)
+        if emergency_stop_config.get('enabled', False) and emergency_stop_config.get('pin_bcm') is not None:
+            pin = emergency_stop_config['pin_bcm']
+            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            claimed_pins.add(pin)
+            logger.info(f"GPIO {pin} (Parada de Emergencia) configurado como ENTRADA (pull: PUD_UP).")
+        
         # Configurar sensores de nivel de tolva (HC-SR04)
         for bin_name, s_config in bin_specific_configs.items():
             trig_pin = s_config.get('trig_pin_bcm')
@@ -132,6 +166,7 @@ def setup_sensor_gpio():
             if trig_pin is not None and echo_pin is not None:
                 GPIO.setup(trig_pin, GPIO.OUT, initial=GPIO.LOW)
                 GPIO.setup(echo_pin, GPIO.IN)
+                claimed_pins.update((trig_pin, echo_pin))
                 logger.info(f"GPIOs para sensor de nivel tolva '{bin_name}' (TRIG={trig_pin}, ECHO={echo_pin}) configurados.")
             else:
                 logger.warning(f"Pines TRIG/ECHO no definidos para sensor de tolva '{bin_name}'.")
@@ -164,6 +199,30 @@ def check_camera_trigger():
     else: # trigger_on == 'HIGH'
         return current_state == GPIO.HIGH
 
+def register_camera_trigger_callback(callback):
+    """
+    Registra un callback invocado (desde el hilo de eventos de RPi.GPIO) en el
+    flanco de activación del sensor de disparo de la cámara. El callback recibe
+    el canal GPIO. Devuelve True si la detección por flanco quedó registrada.
+    """
+    pin = camera_trigger_config.get('pin_bcm')
+    if pin is None:
+        logger.warning("Sensor de disparo de cámara no configurado, no se registra detección por flanco.")
+        return False
+    
+    edge = GPIO.FALLING if camera_trigger_config.get('trigger_on_state', 'LOW') == 'LOW' else GPIO.RISING
+    bouncetime_ms = max(1, int(camera_trigger_config.get('debounce_s', 0.05) * 1000))
+    try:
+        # Permite volver a registrar tras un reinicio del bucle principal
+        GPIO.remove_event_detect(pin)
+        GPIO.add_event_detect(pin, edge, callback=callback, bouncetime=bouncetime_ms)
+        edge_detect_pins.add(pin)
+        logger.info(f"Detección por flanco registrada para disparo de cámara en GPIO {pin}.")
+        return True
+    except RuntimeError as e:
+        logger.error(f"Error registrando detección por flanco en GPIO {pin}: {e}")
+        return False
+
 def wait_for_camera_trigger(timeout_s=None):
     """
     Espera (bloqueante) hasta que el sensor de disparo de la cámara se active
@@ -173,14 +232,48 @@ def wait_for_camera_trigger(timeout_s=None):
     pin = camera_trigger_config.get('pin_bcm')
     if pin is None:
         logger.warning("Sensor de disparo de cámara no configurado. Simulará activación tras input.")
-        input("Presiona Enter para simular disparo de cámara...")
-        return True
+        if sys.stdin is None or not sys.stdin.isatty():
+            # Sin terminal (p. ej. servicio systemd): nadie puede simular el disparo
+            if timeout_s:
+                time.sleep(timeout_s)
+            return False
+        # Esperar Enter como máximo timeout_s en lugar de bloquear indefinidamente en input()
+        print("Presiona Enter para simular disparo de cámara...", flush=True)
+        ready, _, _ = select.select([sys.stdin], [], [], timeout_s)
+        return bool(ready) and bool(sys.stdin.readline())
     
     trigger_on_level = GPIO.LOW if camera_trigger_config.get('trigger_on_state', 'LOW') == 'LOW' else GPIO.HIGH
     debounce_s = camera_trigger_config.get('debounce_s', 0.05)
     
     logger.debug(f"Esperando disparo de cámara en GPIO {pin} (activación en {camera_trigger_config.get('trigger_on_state', 'LOW')})...")
     
+    if GPIO.input(pin) != trigger_on_level and pin not in edge_detect_pins:
+        # Esperar el flanco en el kernel (epoll) en lugar de sondear el pin
+        edge = GPIO.FALLING if trigger_on_level == GPIO.LOW else GPIO.RISING
+        deadline = None if timeout_s is None else time.time() + timeout_s
+        try:
+            while True:
+                timeout_ms = -1
+                if deadline is not None:
+                    remaining_s = deadline - time.time()
+                    if remaining_s <= 0:
+                        logger.debug(f"Timeout esperando disparo de cámara en GPIO {pin}.")
+                        return False
+                    timeout_ms = max(1, int(remaining_s * 1000))
+                channel = GPIO.wait_for_edge(pin, edge, bouncetime=max(1, int(debounce_s * 1000)),
+                                             timeout=timeout_ms)
+                if channel is None:
+                    logger.debug(f"Timeout esperando disparo de cámara en GPIO {pin}.")
+                    return False
+                # bouncetime solo descarta re-disparos: confirmar que el nivel se mantiene, como en el sondeo
+                time.sleep(debounce_s)
+                if GPIO.input(pin) == trigger_on_level:
+                    logger.info(f"Disparo de cámara detectado en GPIO {pin}.")
+                    return True
+                logger.debug(f"Pulso inestable en GPIO {pin} descartado.")
+        except RuntimeError as e:
+            logger.debug(f"wait_for_edge no disponible en GPIO {pin}, sondeando: {e}")
+    
     start_time = time.time()
     while True:
         if GPIO.input(pin) == trigger_on_level:
@@ -195,6 +288,46 @@ def wait_for_camera_trigger(timeout_s=None):
         
         time.sleep(0.005) # Pequeña pausa para no saturar CPU
 
+# --- Funciones para Parada de Emergencia ---
+
+def check_emergency_stop():
+    """
+    Verifica el estado actual del botón de parada de emergencia.
+    Devuelve True si está activada, False en caso contrario o si no está configurada.
+    """
+    pin = emergency_stop_config.get('pin_bcm')
+    if pin is None or not emergency_stop_config.get('enabled', False):
+        return False
+    
+    current_state = GPIO.input(pin)
+    if emergency_stop_config.get('normally_closed', True):
+        # Contacto NC: en reposo cierra a GND (LOW); al pulsarse se abre y el pull-up lo lleva a HIGH
+        return current_state == GPIO.HIGH
+    else:
+        return current_state == GPIO.LOW
+
+def register_emergency_stop_callback(callback):
+    """
+    Registra un callback invocado (desde el hilo de eventos de RPi.GPIO) en cada
+    flanco del botón de parada de emergencia. El callback recibe el canal GPIO.
+    Devuelve True si la detección por flanco quedó registrada.
+    """
+    pin = emergency_stop_config.get('pin_bcm')
+    if pin is None or not emergency_stop_config.get('enabled', False):
+        logger.warning("Parada de emergencia no configurada, no se registra detección por flanco.")
+        return False
+    
+    bouncetime_ms = max(1, int(emergency_stop_config.get('debounce_time_ms', 10)))
+    try:
+        GPIO.remove_event_detect(pin)
+        GPIO.add_event_detect(pin, GPIO.BOTH, callback=callback, bouncetime=bouncetime_ms)
+        edge_detect_pins.add(pin)
+        logger.info(f"Detección por flanco registrada para parada de emergencia en GPIO {pin}.")
+        return True
+    except RuntimeError as e:
+        logger.error(f"Error registrando detección por flanco en GPIO {pin}: {e}")
+        return False
+
 # --- Funciones para Sensores de Nivel de Tolva (Ultrasónicos HC-SR04) ---
 
 def _calculate_sound_speed_with_temp(temperature_c):
@@ -337,13 +470,24 @@ def get_all_bin_fill_levels():
         levels[bin_name] = get_bin_fill_level(bin_name)
     return levels
 
+def get_claimed_pins():
+    """Devuelve los pines GPIO configurados por los sensores."""
+    return sorted(claimed_pins)
+
 def cleanup_sensor_gpio():
     """Libera los recursos GPIO utilizados por los sensores."""
     logger.info("Limpiando GPIOs de los sensores...")
+    # Detener los hilos de detección por flanco antes de que main libere los pines
+    for pin in list(edge_detect_pins):
+        try:
+            GPIO.remove_event_detect(pin)
+        except RuntimeError as e:
+            logger.warning(f"Error quitando detección por flanco en GPIO {pin}: {e}")
+    edge_detect_pins.clear()
     # La limpieza general de GPIO.cleanup() en main_sistema_banda.py
     # se encargará de todos los pines. Este módulo no necesita llamar
     # a GPIO.cleanup() por sí mismo si es parte de un sistema más grande.
-    logger.info("Limpieza de GPIOs de sensores completada (no se requiere acción específica aquí si se limpia en main).")
+    logger.info("Limpieza de GPIOs de sensores completada (GPIO.cleanup() se ejecuta en main).")
 
 # --- Código de Prueba ---
 if __name__ == '__main__':
@@ -18,6 +18,7 @@ import argparse
 import yaml
 import logging
 import time
+import hashlib
 import asyncio
 import threading
 from pathlib import Path
@@ -74,6 +75,9 @@ class ModelConfiguration:
     max_detections: int = 50
     nms_threshold: float = 0.45
     agnostic_nms: bool = False
+    backend: str = "torch"  # torch, onnx, openvino (exportados desde el .pt)
+    int8: bool = False  # Cuantización INT8 al exportar (openvino/onnx)
+    calibration_data: Optional[str] = None  # YAML del dataset para calibrar INT8
 
 @dataclass
 class DetectionResult:
@@ -134,6 +138,9 @@ class AdvancedTrashDetector:
         # Cache de inferencia para optimización
         self._inference_cache = {}
         self._cache_size_limit = 100
+        
+        # Buffers reutilizados para reducir frames grandes antes de la inferencia: (posición, forma) -> buffer
+        self._resize_bufs: Dict[Tuple[int, Tuple[int, ...]], np.ndarray] = {}
     
     async def initialize(self) -> bool:
         """Inicializar el detector."""
@@ -156,8 +163,8 @@ class AdvancedTrashDetector:
             # Configurar dispositivo
             await self._configure_device()
             
-            # Configurar YOLOv12 específico
-            if self.config.model_type.lower() == "yolov12":
+            # Configurar YOLOv12 específico (solo aplica al modelo PyTorch)
+            if self.config.model_type.lower() == "yolov12" and self.config.backend == "torch":
                 await self._configure_yolov12()
             
             self.state = DetectorState.READY
@@ -231,8 +238,20 @@ class AdvancedTrashDetector:
         try:
             load_start = time.time()
             
-            # Cargar modelo con configuración específica
-            self.model = YOLO(self.config.model_path)
+            # Cargar modelo con configuración específica (exportado si el backend no es torch)
+            if self.config.backend == "torch":
+                self.model = YOLO(self.config.model_path)
+            else:
+                try:
+                    self.model = YOLO(self._resolve_backend_model(), task="detect")
+                except Exception as e:
+                    if Path(self.config.model_path).suffix != ".pt":
+                        raise
+                    # Respaldo: el modelo FP32 original con PyTorch
+                    self.logger.warning(f"No se pudo usar el backend {self.config.backend} "
+                                        f"(int8={self.config.int8}): {e}. Usando el modelo PyTorch FP32")
+                    self.config.backend = "torch"
+                    self.model = YOLO(self.config.model_path)
             
             # Obtener nombres de clases del modelo
             if hasattr(self.model, 'names') and self.model.names:
@@ -250,9 +269,40 @@ class AdvancedTrashDetector:
             self.logger.error(f"Error cargando modelo: {e}")
             return False
     
+    def _resolve_backend_model(self) -> str:
+        """Ruta del modelo para el backend configurado; exporta el .pt una sola vez si falta."""
+        backend = self.config.backend.lower()
+        source = Path(self.config.model_path)
+        if backend == "torch" or source.suffix != ".pt":
+            # Backend torch o ruta que ya apunta a un modelo exportado
+            return str(source)
+        
+        if backend == "onnx":
+            exported = source.with_suffix(".onnx")
+        elif backend == "openvino":
+            suffix = "_int8_openvino_model" if self.config.int8 else "_openvino_model"
+            exported = source.with_name(source.stem + suffix)
+        else:
+            raise ValueError(f"Backend de inferencia no soportado: {self.config.backend}")
+        
+        if not exported.exists():
+            self.logger.info(f"Exportando {source} a {backend} (int8={self.config.int8}), solo la primera vez")
+            export_args = {'format': backend, 'imgsz': self.config.input_size[0], 'int8': self.config.int8}
+            if self.config.int8 and self.config.calibration_data:
+                export_args['data'] = self.config.calibration_data
+            exported = Path(YOLO(str(source)).export(**export_args))
+        
+        self.logger.info(f"Usando modelo {backend}: {exported}")
+        return str(exported)
+    
     async def _configure_device(self) -> None:
         """Configurar dispositivo de inferencia."""
         try:
+            if self.config.backend != "torch":
+                # Los modelos exportados (ONNX/OpenVINO) se ejecutan en CPU con su propio runtime
+                self.config.device = "cpu"
+                return
+            
             if self.config.device == "auto":
                 # Detección automática del mejor dispositivo
                 import torch
@@ -269,6 +319,11 @@ class AdvancedTrashDetector:
             # Configurar modelo para usar el dispositivo seleccionado
             if self.model:
                 self.model.to(self.config.device)
+            
+            if str(self.config.device).startswith("cuda"):
+                # Tamaño de entrada fijo: cuDNN elige una vez los kernels más rápidos y los reutiliza
+                import torch
+                torch.backends.cudnn.benchmark = True
                 
         except Exception as e:
             self.logger.warning(f"Error configurando dispositivo: {e}")
@@ -351,7 +406,7 @@ class AdvancedTrashDetector:
                     raise ValueError("Frame de entrada inválido")
                 
                 # Verificar cache primero
-                frame_hash = hash(frame.tobytes())
+                frame_hash = self._frame_key(frame)
                 if frame_hash in self._inference_cache:
                     self.logger.debug("Usando resultado de cache")
                     return self._inference_cache[frame_hash]
@@ -380,79 +435,83 @@ class AdvancedTrashDetector:
                 
                 return []
     
-    async def _run_inference(self, frame: np.ndarray) -> List[DetectionResult]:
-        """Ejecutar inferencia del modelo."""
+    async def detect_objects_batch(self, frames: List[np.ndarray]) -> List[List[DetectionResult]]:
+        """Detectar objetos en varios frames con una sola llamada al modelo."""
+        if self.state != DetectorState.READY:
+            self.logger.warning(f"Detector no está listo. Estado actual: {self.state}")
+            return [[] for _ in frames]
+        
         try:
-            # Configurar parámetros de inferencia
-            inference_params = {
-                'conf': self.config.min_confidence,
-                'iou': self.config.nms_threshold,
-                'max_det': self.config.max_detections,
-                'agnostic_nms': self.config.agnostic_nms,
-                'half': self.config.half_precision,
-                'device': self.config.device,
-                'verbose': False
-            }
+            self.state = DetectorState.DETECTING
+            start_time = time.time()
             
-            # Añadir parámetros específicos de YOLOv12
-            if self.config.model_type.lower() == "yolov12":
-                if self.config.use_flash_attention:
-                    inference_params['use_flash_attention'] = True
-                # Otros parámetros específicos pueden añadirse aquí
+            # Validar entrada
+            if any(frame is None or frame.size == 0 for frame in frames):
+                raise ValueError("Frame de entrada inválido en el lote")
             
-            # Ejecutar inferencia
-            results = self.model(frame, **inference_params)
+            # Una sola pasada del modelo amortiza el lanzamiento y la transferencia de memoria
+            inputs = [self._downscale(frame, slot) for slot, frame in enumerate(frames)]
+            results = self.model([small for small, _ in inputs], **self._inference_params())
+            batch_detections = [
+                self._parse_result(result, small, scale) for result, (small, scale) in zip(results, inputs)
+            ]
             
-            # Procesar resultados
+            # Actualizar métricas (tiempo repartido entre los frames del lote)
+            inference_time = (time.time() - start_time) * 1000 / len(frames)
+            for detections in batch_detections:
+                await self._update_metrics(detections, inference_time)
+            
+            self.state = DetectorState.READY
+            return batch_detections
+        
+        except Exception as e:
+            self.logger.error(f"Error en detección por lotes: {e}")
+            self.state = DetectorState.ERROR
+            self._error_history.append(time.time())
+            
+            if not self._recovery_in_progress:
+                await self._attempt_recovery("detection_error")
+            
+            return [[] for _ in frames]
+    
+    @staticmethod
+    def _frame_key(frame: np.ndarray) -> Tuple[Tuple[int, ...], bytes]:
+        """Clave de cache del frame sin copiarlo (tobytes() duplicaba el frame entero)."""
+        # ravel() es una vista en frames contiguos; hashlib lee el buffer directamente
+        data = np.ascontiguousarray(frame).ravel()
+        return frame.shape, hashlib.blake2b(data, digest_size=16).digest()
+    
+    def _inference_params(self) -> Dict[str, Any]:
+        """Parámetros de inferencia del modelo."""
+        inference_params = {
+            'conf': self.config.min_confidence,
+            'iou': self.config.nms_threshold,
+            'max_det': self.config.max_detections,
+            'agnostic_nms': self.config.agnostic_nms,
+            'half': self.config.half_precision,
+            'device': self.config.device,
+            'verbose': False
+        }
+        
+        # Añadir parámetros específicos de YOLOv12
+        if self.config.model_type.lower() == "yolov12":
+            if self.config.use_flash_attention:
+                inference_params['use_flash_attention'] = True
+            # Otros parámetros específicos pueden añadirse aquí
+        
+        return inference_params
+    
+    async def _run_inference(self, frame: np.ndarray) -> List[DetectionResult]:
+        """Ejecutar inferencia del modelo."""
+        try:
+            # Ejecutar inferencia sobre el frame ya reducido al tamaño de entrada del modelo
+            small, scale = self._downscale(frame)
+            results = self.model(small, **self._inference_params())
+            
+            # Procesar resultados (coordenadas devueltas en el frame original)
             detections = []
             for result in results:
-                if hasattr(result, 'boxes') and result.boxes is not None:
-                    boxes = result.boxes
-                    
-                    for i in range(len(boxes)):
-                        try:
-                            # Extraer datos de la detección
-                            conf = float(boxes.conf[i])
-                            cls_idx = int(boxes.cls[i])
-                            
-                            # Validar índice de clase
-                            if 0 <= cls_idx < len(self.model_class_names):
-                                class_name = self.model_class_names[cls_idx]
-                            else:
-                                self.logger.warning(f"Índice de clase inválido: {cls_idx}")
-                                continue
-                            
-                            # Extraer coordenadas
-                            x1, y1, x2, y2 = map(int, boxes.xyxy[i])
-                            
-                            # Validar coordenadas
-                            h, w = frame.shape[:2]
-                            x1 = max(0, min(x1, w - 1))
-                            y1 = max(0, min(y1, h - 1))
-                            x2 = max(0, min(x2, w - 1))
-                            y2 = max(0, min(y2, h - 1))
-                            
-                            if x1 >= x2 or y1 >= y2:
-                                continue
-                            
-                            # Calcular área y centro
-                            area = (x2 - x1) * (y2 - y1)
-                            center = ((x1 + x2) / 2, (y1 + y2) / 2)
-                            
-                            # Crear resultado de detección
-                            detection = DetectionResult(
-                                class_name=class_name,
-                                confidence=conf,
-                                bbox=(x1, y1, x2, y2),
-                                area=area,
-                                center=center
-                            )
-                            
-                            detections.append(detection)
-                            
-                        except Exception as e:
-                            self.logger.warning(f"Error procesando detección {i}: {e}")
-                            continue
+                detections.extend(self._parse_result(result, small, scale))
             
             return detections
             
@@ -460,6 +519,73 @@ class AdvancedTrashDetector:
             self.logger.error(f"Error en inferencia: {e}")
             raise
     
+    def _downscale(self, frame: np.ndarray, slot: int = 0) -> Tuple[np.ndarray, float]:
+        """Reducir el frame al tamaño de entrada del modelo (INTER_AREA, buffer reutilizado) y su escala."""
+        h, w = frame.shape[:2]
+        scale = max(self.config.input_size) / max(h, w)
+        if scale >= 1.0:
+            # El letterbox del modelo ya trabaja a este tamaño o mayor
+            return frame, 1.0
+        
+        shape = (round(h * scale), round(w * scale)) + frame.shape[2:]
+        buf = self._resize_bufs.get((slot, shape))
+        if buf is None:
+            buf = self._resize_bufs[(slot, shape)] = np.empty(shape, dtype=frame.dtype)
+        cv2.resize(frame, (shape[1], shape[0]), dst=buf, interpolation=cv2.INTER_AREA)
+        return buf, scale
+    
+    def _parse_result(self, result, frame: np.ndarray, scale: float = 1.0) -> List[DetectionResult]:
+        """Convertir la salida del modelo para un frame (reducido por `scale`) en detecciones."""
+        boxes = getattr(result, 'boxes', None)
+        if boxes is None or len(boxes) == 0:
+            return []
+        
+        # Una sola copia a CPU por frame: columnas x1, y1, x2, y2, conf, cls
+        data = boxes.data
+        data = data.cpu().numpy() if hasattr(data, 'cpu') else np.asarray(data)
+        
+        # Validar índices de clase
+        cls_idx = data[:, 5].astype(np.int32)
+        valid = (cls_idx >= 0) & (cls_idx < len(self.model_class_names))
+        if not valid.all():
+            self.logger.warning(f"Índices de clase inválidos: {cls_idx[~valid].tolist()}")
+        
+        # Truncar y recortar coordenadas al frame en bloque
+        h, w = frame.shape[:2]
+        xyxy = data[:, :4].astype(np.int32)
+        np.clip(xyxy[:, 0::2], 0, w - 1, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, h - 1, out=xyxy[:, 1::2])
+        valid &= (xyxy[:, 0] < xyxy[:, 2]) & (xyxy[:, 1] < xyxy[:, 3])
+        if not valid.any():
+            return []
+        
+        xyxy = xyxy[valid]
+        if scale != 1.0:
+            # Volver a coordenadas del frame original
+            xyxy = (xyxy / scale).astype(np.int32)
+        conf = data[valid, 4]
+        cls_idx = cls_idx[valid]
+        area = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+        cx = (xyxy[:, 0] + xyxy[:, 2]) / 2
+        cy = (xyxy[:, 1] + xyxy[:, 3]) / 2
+        
+        # Convertir a escalares Python una sola vez para construir los resultados
+        names = self.model_class_names
+        timestamp = time.time()
+        return [
+            DetectionResult(
+                class_name=names[c],
+                confidence=cf,
+                bbox=(x1, y1, x2, y2),
+                area=ar,
+                center=(x, y),
+                timestamp=timestamp
+            )
+            for (x1, y1, x2, y2), cf, c, ar, x, y in zip(
+                xyxy.tolist(), conf.tolist(), cls_idx.tolist(), area.tolist(), cx.tolist(), cy.tolist()
+            )
+        ]
+    
     async def _update_metrics(self, detections: List[DetectionResult], inference_time_ms: float) -> None:
         """Actualizar métricas del detector."""
         try:
@@ -507,7 +633,7 @@ class AdvancedTrashDetector:
         except Exception as e:
             self.logger.error(f"Error actualizando métricas: {e}")
     
-    async def _cache_result(self, frame_hash: int, detections: List[DetectionResult]) -> None:
+    async def _cache_result(self, frame_hash: Tuple[Tuple[int, ...], bytes], detections: List[DetectionResult]) -> None:
         """Guardar resultado en cache."""
         try:
             if len(self._inference_cache) >= self._cache_size_limit:
@@ -661,16 +787,38 @@ class AdvancedTrashDetector:
 class TrashDetector:
     """Clase legacy para mantener compatibilidad con código existente."""
     
-    def __init__(self, model_path: str, min_confidence: float = 0.5):
+    def __init__(self, model_path: str, min_confidence: float = 0.5, backend: str = "torch",
+                 int8: bool = False, calibration_data: Optional[str] = None):
         """Inicializar detector legacy."""
         config = ModelConfiguration(
             model_path=model_path,
             min_confidence=min_confidence,
-            model_type="yolov12"  # Default a YOLOv12
+            model_type="yolov12",  # Default a YOLOv12
+            backend=backend,
+            int8=int8,
+            calibration_data=calibration_data
         )
         
         self._advanced_detector = AdvancedTrashDetector(config)
         self._initialized = False
+        
+        # Loop propio reutilizado entre llamadas (antes se creaba y cerraba uno por frame)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+    
+    def _run(self, coro):
+        """Ejecutar una corrutina del detector en el loop propio de forma sincrónica."""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(coro)
+    
+    def close(self) -> None:
+        """Cerrar el loop interno del detector."""
+        with self._loop_lock:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.close()
+            self._loop = None
     
     async def _ensure_initialized(self):
         """Asegurar que el detector está inicializado."""
@@ -683,32 +831,33 @@ class TrashDetector:
         """Detectar objetos (interfaz legacy)."""
         try:
             # Ejecutar de forma sincrónica para compatibilidad
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            if not self._initialized:
+                self._run(self._ensure_initialized())
+            detections = self._run(self._advanced_detector.detect_objects(frame))
             
-            try:
-                loop.run_until_complete(self._ensure_initialized())
-                detections = loop.run_until_complete(
-                    self._advanced_detector.detect_objects(frame)
-                )
-                
-                # Convertir a formato legacy
-                legacy_results = []
-                for detection in detections:
-                    legacy_results.append((
-                        detection.class_name,
-                        detection.confidence,
-                        detection.bbox
-                    ))
-                
-                return legacy_results
-                
-            finally:
-                loop.close()
+            # Convertir a formato legacy
+            return [(d.class_name, d.confidence, d.bbox) for d in detections]
                 
         except Exception as e:
             logger.error(f"Error en detect_objects legacy: {e}")
             return []
+    
+    def detect_objects_batch(self, frames) -> list:
+        """Detectar objetos en varios frames con una sola inferencia (interfaz legacy)."""
+        try:
+            if not self._initialized:
+                self._run(self._ensure_initialized())
+            batch_detections = self._run(self._advanced_detector.detect_objects_batch(frames))
+            
+            # Convertir a formato legacy, una lista por frame
+            return [
+                [(d.class_name, d.confidence, d.bbox) for d in detections]
+                for detections in batch_detections
+            ]
+        
+        except Exception as e:
+            logger.error(f"Error en detect_objects_batch legacy: {e}")
+            return [[] for _ in frames]
 
 # --- Funciones de Utilidad ---
 
@@ -738,6 +887,15 @@ def parse_arguments():
                         help='Usar precisión FP16')
     parser.add_argument('--no-display', action='store_true',
                         help='No mostrar ventana de video')
+    parser.add_argument('--backend', type=str, default='torch',
+                        choices=['torch', 'onnx', 'openvino'],
+                        help='Backend de inferencia (exporta el .pt la primera vez)')
+    parser.add_argument('--int8', action='store_true',
+                        help='Cuantizar a INT8 al exportar (CPU)')
+    parser.add_argument('--data', type=str, default=None,
+                        help='YAML del dataset para calibrar la cuantización INT8')
+    parser.add_argument('--export-only', action='store_true',
+                        help='Solo exportar/cargar el modelo para el backend y salir')
     
     return parser.parse_args()
 
@@ -752,17 +910,24 @@ async def main():
         min_confidence=args.conf,
         device=args.device,
         use_flash_attention=args.flash_attention,
-        half_precision=args.half
+        half_precision=args.half,
+        backend=args.backend,
+        int8=args.int8,
+        calibration_data=args.data
     )
     
     detector = AdvancedTrashDetector(config)
     
     try:
-        # Inicializar detector
+        # Inicializar detector (exporta el modelo si el backend lo requiere)
         if not await detector.initialize():
             logger.error("Error inicializando detector")
             return 1
         
+        if args.export_only:
+            logger.info(f"Modelo listo para el backend {config.backend}")
+            return 0
+        
         # Configurar cámara
         cap = cv2.VideoCapture(args.camera)
         if not cap.isOpened():
@@ -777,9 +942,11 @@ async def main():
         # Variables de rendimiento
         frame_count = 0
         start_time = time.time()
+        frame = None
         
         while True:
-            ret, frame = cap.read()
+            # Reutilizar el mismo buffer; el frame se pasa al modelo en memoria, sin disco
+            ret, frame = cap.read(frame)
             if not ret:
                 logger.error("Error capturando frame")
                 break
@@ -789,7 +956,8 @@ async def main():
             
             # Mostrar resultados
             if not args.no_display:
-                annotated_frame = frame.copy()
+                # Se anota sobre el propio frame: no se vuelve a usar tras la detección
+                annotated_frame = frame
                 
                 for detection in detections:
                     x1, y1, x2, y2 = detection.bbox
@@ -994,11 +994,17 @@ class EcoSortAPIEnhanced:
         """Inicia tareas en segundo plano"""
         # Tarea para emitir métricas en tiempo real
         def realtime_metrics_broadcaster():
+            last_sent = None
             while True:
                 try:
                     time.sleep(5)  # Cada 5 segundos
                     if self.socket_rooms['dashboard']:
                         data = self.db.get_realtime_analytics(minutes=1)
+                        # Sin cambios desde el último envío (o el mismo resultado cacheado): no retransmitir
+                        content = (data.get('timeline'), data.get('current'))
+                        if content == last_sent:
+                            continue
+                        last_sent = content
                         self.socketio.emit('metrics_update', {
                             'data': data,
                             'timestamp': time.time()
@@ -158,10 +158,13 @@ class DatabaseManagerEnhanced:
         self._realtime_metrics = deque(maxlen=1000)
         self._notifications_queue = deque(maxlen=500)
         
-        # Configuración de performance
-        self.batch_size = 100
+        # Configuración de performance: una transacción cada flush_interval_s o cada batch_size filas
+        self.batch_size = 200
+        self.flush_interval_s = 0.5
         self.write_buffer = []
-        self._write_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # Solo protege el buffer, nunca se retiene durante el commit
+        self._flush_lock = threading.Lock()  # Serializa los flushes para conservar el orden
+        self._flush_requested = threading.Event()
         
         # Crear directorio si no existe
         Path(os.path.dirname(db_path)).mkdir(parents=True, exist_ok=True)
@@ -432,14 +435,31 @@ class DatabaseManagerEnhanced:
         """Worker para escrituras por lotes"""
         while True:
             try:
-                time.sleep(1)  # Escribir cada segundo
-                if self.write_buffer:
-                    with self._write_lock:
-                        if self.write_buffer:
-                            self._flush_write_buffer()
+                # Cada flush_interval_s, o antes si el buffer llegó a batch_size
+                self._flush_requested.wait(self.flush_interval_s)
+                self._flush_requested.clear()
+                self.flush()
             except Exception as e:
                 logger.error(f"Error en batch writer: {e}")
     
+    def flush(self) -> None:
+        """Escribe ya lo acumulado en el buffer, en una sola transacción"""
+        with self._flush_lock:
+            with self._write_lock:
+                if not self.write_buffer:
+                    return
+                buffer, self.write_buffer = self.write_buffer, []
+            self._flush_write_buffer(buffer)
+    
+    def _buffer_writes(self, entries) -> int:
+        """Añade (tabla, fila) al buffer de escritura; devuelve la posición de la primera"""
+        with self._write_lock:
+            first = len(self.write_buffer) + 1
+            self.write_buffer.extend(entries)
+            if len(self.write_buffer) >= self.batch_size:
+                self._flush_requested.set()
+        return first
+    
     def _metrics_worker(self):
         """Worker para generar métricas en tiempo real"""
         while True:
@@ -460,7 +480,36 @@ class DatabaseManagerEnhanced:
     
     def record_classification_enhanced(self, **kwargs) -> int:
         """Registra clasificación con datos enhanced"""
-        classification_data = {
+        return self.record_classifications_bulk([kwargs])[0]
+    
+    def record_classifications_bulk(self, records: List[Dict[str, Any]]) -> List[int]:
+        """Registra un lote de clasificaciones tomando el lock de escritura una sola vez"""
+        rows = [self._build_classification_data(record) for record in records]
+        
+        # Agregar a buffer para batch write
+        first_id = self._buffer_writes(('classifications_enhanced', row) for row in rows)
+        
+        # Invalidar cache relacionado (una vez por lote)
+        self.cache.invalidate_pattern('stats_')
+        self.cache.invalidate_pattern('recent_')
+        
+        # Crear notificación si es necesario
+        for classification_data in rows:
+            if classification_data['error_occurred']:
+                self._create_notification(
+                    type='error',
+                    severity='warning',
+                    title='Error en Clasificación',
+                    message=f"Error procesando objeto {classification_data['category']}: {classification_data['error_message']}",
+                    category='classification'
+                )
+        
+        # Retornar IDs temporales (se actualizarán en flush)
+        return list(range(first_id, first_id + len(rows)))
+    
+    def _build_classification_data(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Fila de classifications_enhanced a partir de los datos de una clasificación"""
+        return {
             'timestamp': time.time(),
             'object_uuid': kwargs.get('object_uuid', self._generate_uuid()),
             'session_id': kwargs.get('session_id'),
@@ -487,27 +536,6 @@ class DatabaseManagerEnhanced:
             'material_composition': json.dumps(kwargs.get('material_composition')) if kwargs.get('material_composition') else None,
             'recycling_score': kwargs.get('recycling_score')
         }
-        
-        # Agregar a buffer para batch write
-        with self._write_lock:
-            self.write_buffer.append(('classifications_enhanced', classification_data))
-        
-        # Invalidar cache relacionado
-        self.cache.invalidate_pattern('stats_')
-        self.cache.invalidate_pattern('recent_')
-        
-        # Crear notificación si es necesario
-        if classification_data['error_occurred']:
-            self._create_notification(
-                type='error',
-                severity='warning',
-                title='Error en Clasificación',
-                message=f"Error procesando objeto {classification_data['category']}: {classification_data['error_message']}",
-                category='classification'
-            )
-        
-        # Retornar ID temporal (se actualizará en flush)
-        return len(self.write_buffer)
     
     def get_realtime_analytics(self, minutes: int = 10) -> Dict[str, Any]:
         """Obtiene analytics en tiempo real para animaciones"""
@@ -657,17 +685,10 @@ class DatabaseManagerEnhanced:
         self._notifications_queue.append(notification_data)
         
         # Agregar a buffer para escritura
-        with self._write_lock:
-            self.write_buffer.append(('notifications', notification_data))
+        self._buffer_writes([('notifications', notification_data)])
     
-    def _flush_write_buffer(self):
+    def _flush_write_buffer(self, buffer_copy: List[Tuple[str, Dict[str, Any]]]):
         """Ejecuta escrituras por lotes"""
-        if not self.write_buffer:
-            return
-        
-        buffer_copy = self.write_buffer.copy()
-        self.write_buffer.clear()
-        
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -11,6 +11,7 @@ utilizando IA, sensores, y actuadores en una Raspberry Pi con capacidades avanza
 de recuperación de errores, monitoreo y seguridad.
 """
 
+import argparse
 import asyncio
 import cv2
 import time
@@ -19,20 +20,55 @@ import logging
 import threading
 import os
 import signal
+import socket
+import hashlib
+import copy
+import heapq
+import itertools
+from array import array
 import sys
 import psutil
 import numpy as np
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Tuple, Any, Callable, Union
-from collections import deque
+from typing import Optional, Dict, List, Set, Tuple, Any, Callable, Union, Mapping
+from collections import deque, Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from statistics import fmean
 import RPi.GPIO as GPIO
 
 # Configuración de logging estructurado con rotación
 from logging.handlers import RotatingFileHandler
 
+# Notificaciones del kernel para recarga de configuración (opcional)
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+    INotify = None
+    inotify_flags = None
+
+# Parser JSON acelerado para la configuración (opcional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Codificación JPEG con libjpeg-turbo (SIMD NEON en ARM) para capturas (opcional)
+try:
+    from turbojpeg import TurboJPEG
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+    TurboJPEG = None
+
 # Crear directorio de logs si no existe
 os.makedirs('logs', exist_ok=True)
 
@@ -62,6 +98,94 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Archivo donde se recuerda el último índice de cámara que abrió correctamente
+CAMERA_CACHE_FILE = os.path.expanduser('~/.ecosort/camera_cache.json')
+
+# Propiedades opcionales de cámara: (propiedad OpenCV, clave en camera_settings)
+CAMERA_PROPERTIES = (
+    (cv2.CAP_PROP_FPS, 'fps'),
+    (cv2.CAP_PROP_EXPOSURE, 'exposure'),
+    (cv2.CAP_PROP_BRIGHTNESS, 'brightness'),
+    (cv2.CAP_PROP_CONTRAST, 'contrast'),
+)
+
+# Categorías del sistema que no corresponden a clases del modelo
+SENTINEL_CLASSES = frozenset({'other', 'Desconocido', 'ErrorClase', 'ErrorIA'})
+AI_ERROR_CATEGORY = 'ErrorIA'
+
+# Pipeline GStreamer por defecto (camera_settings.gstreamer_pipeline = true): solo el último frame
+DEFAULT_GSTREAMER_PIPELINE = (
+    "v4l2src device=/dev/video{index} ! image/jpeg,width={width},height={height},framerate={fps}/1 "
+    "! jpegdec ! videoconvert ! video/x-raw,format=BGR ! appsink drop=true max-buffers=1 sync=false"
+)
+
+# Rango permitido para la duración de activación de los desviadores (s)
+DIVERTER_DURATION_MIN_S = 0.05
+DIVERTER_DURATION_MAX_S = 10.0
+
+# Frame negro de solo lectura para las pruebas de inferencia (se reserva una sola vez)
+_DUMMY_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+_DUMMY_FRAME.setflags(write=False)
+
+# Sensor térmico del SoC (sysfs); se mantiene abierto y se lee con pread
+THERMAL_ZONE_FILE = '/sys/class/thermal/thermal_zone0/temp'
+
+
+def _open_thermal_fd() -> int:
+    """Abre el sensor térmico en solo lectura; -1 si no está disponible"""
+    try:
+        return os.open(THERMAL_ZONE_FILE, os.O_RDONLY)
+    except OSError:
+        return -1
+
+
+def _close_thermal_fd(fd: int) -> int:
+    """Cierra el descriptor del sensor térmico y devuelve -1"""
+    if fd >= 0:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    return -1
+
+
+class DiscardableExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor que puede descartar el trabajo aún encolado al cerrarse (también en 3.8)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending_futures: Set[Future] = set()
+        self._pending_lock = threading.Lock()
+    
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = super().submit(fn, *args, **kwargs)
+        with self._pending_lock:
+            self._pending_futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+    
+    def _forget(self, future: Future) -> None:
+        with self._pending_lock:
+            self._pending_futures.discard(future)
+    
+    def shutdown_discarding_pending(self) -> None:
+        """Cancela lo encolado y espera solo a lo que ya se está ejecutando"""
+        if sys.version_info >= (3, 9):
+            self.shutdown(wait=True, cancel_futures=True)
+            return
+        with self._pending_lock:
+            pending = list(self._pending_futures)
+        for future in pending:
+            future.cancel()  # No afecta a las tareas ya en ejecución
+        self.shutdown(wait=True)
+
+
+# Bits del estado de ejecución de EcoSortSystem (un solo entero para las lecturas en caliente)
+FLAG_RUNNING = 1 << 0
+FLAG_MAINTENANCE = 1 << 1
+FLAG_EMERGENCY = 1 << 2
+FLAG_SHUTDOWN = 1 << 3
+
 
 class SystemState(Enum):
     """Estados del sistema de clasificación"""
@@ -125,6 +249,7 @@ class ClassificationResult:
     detection_time: float
     error_message: Optional[str] = None
     is_error: bool = False
+    severity: ErrorSeverity = ErrorSeverity.LOW
 
 
 @dataclass
@@ -135,12 +260,14 @@ class SystemMetrics:
     failed_classifications: int = 0
     diversions_attempted: int = 0
     diversions_successful: int = 0
+    objects_dropped: int = 0
+    images_dropped: int = 0  # Capturas no guardadas por escritor de imágenes saturado
     system_uptime: float = 0.0
     average_processing_time_ms: float = 0.0
     cpu_usage_percent: float = 0.0
     memory_usage_percent: float = 0.0
     temperature_celsius: float = 0.0
-    error_count_by_severity: Dict[str, int] = field(default_factory=dict)
+    error_count_by_severity: Counter = field(default_factory=Counter)  # ErrorSeverity -> conteo
     recovery_attempts: int = 0
     successful_recoveries: int = 0
     last_error: Optional[str] = None
@@ -160,6 +287,458 @@ class SystemAlert:
     resolution_time: Optional[datetime] = None
 
 
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Valores de configuración leídos en los caminos por evento (se reconstruye al recargar)"""
+    belt_speed: float
+    diversion_delays: Mapping[str, float]  # categoría -> retardo cámara→desviador (s)
+    diversion_coalesce_s: float
+    diverter_duration: float
+    bin_full_threshold: float
+    bin_critical_threshold: float
+    bin_level_epsilon: float
+    save_images: bool
+    image_quality: int
+    disk_check_interval_s: float
+
+
+class DetectionRing:
+    """Buffer circular en arrays paralelos (SoA) para objetos pendientes de desviación"""
+    
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.object_ids = np.zeros(capacity, dtype=np.int64)
+        self.classification_ids = np.full(capacity, -1, dtype=np.int64)
+        self.class_idx = np.zeros(capacity, dtype=np.int16)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.confidences = np.zeros(capacity, dtype=np.float32)
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def full(self) -> bool:
+        """True si el siguiente push descartará el objeto más antiguo"""
+        return self.count == self.capacity
+    
+    def push(self, object_id: int, classification_id: Optional[int], class_idx: int,
+             timestamp: float, confidence: float) -> None:
+        """Añade un objeto; si está lleno descarta el más antiguo (como deque con maxlen)"""
+        tail = (self.head + self.count) % self.capacity
+        self.object_ids[tail] = object_id
+        self.classification_ids[tail] = -1 if classification_id is None else classification_id
+        self.class_idx[tail] = class_idx
+        self.timestamps[tail] = timestamp
+        self.confidences[tail] = confidence
+        
+        if self.count == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+            self.dropped += 1
+        else:
+            self.count += 1
+    
+    def pop(self) -> Tuple[int, Optional[int], int, float, float]:
+        """Extrae el objeto más antiguo como tupla de tipos nativos"""
+        if self.count == 0:
+            raise IndexError("pop de DetectionRing vacío")
+        
+        i = self.head
+        self.head = (self.head + 1) % self.capacity
+        self.count -= 1
+        
+        classification_id = int(self.classification_ids[i])
+        return (int(self.object_ids[i]),
+                None if classification_id < 0 else classification_id,
+                int(self.class_idx[i]),
+                float(self.timestamps[i]),
+                float(self.confidences[i]))
+    
+    def clear(self) -> None:
+        """Vacía el buffer sin liberar los arrays"""
+        self.head = 0
+        self.count = 0
+
+
+class DiversionTable:
+    """Desviaciones activas en arrays paralelos (SoA) preasignados, con índice object_id -> fila"""
+    
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.object_ids = array('q', bytes(8 * capacity))
+        self.activation_times = array('d', bytes(8 * capacity))
+        self.created_times = array('d', bytes(8 * capacity))
+        self.confidences = array('f', bytes(4 * capacity))
+        # Metadatos no numéricos en listas paralelas
+        self.categories: List[Optional[str]] = [None] * capacity
+        self.classification_ids: List[Any] = [None] * capacity  # int, None o Future del escritor de BD
+        self._rows: Dict[int, int] = {}
+        self._size = 0  # Filas [0, _size) ocupadas; sin huecos
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __contains__(self, object_id: int) -> bool:
+        return object_id in self._rows
+    
+    def _columns(self) -> tuple:
+        return (self.object_ids, self.activation_times, self.created_times, self.confidences,
+                self.categories, self.classification_ids)
+    
+    def full(self) -> bool:
+        """True si no queda ninguna fila libre"""
+        return self._size == self.capacity
+    
+    def row(self, object_id: int) -> Optional[int]:
+        """Fila de un objeto o None si no está activo"""
+        return self._rows.get(object_id)
+    
+    def add(self, object_id: int, activation_time: float, created_time: float,
+            category: str, classification_id: Any, confidence: float) -> bool:
+        """Registra una desviación agendada; False si la tabla está llena"""
+        self.remove(object_id)  # Reagendado: una sola búsqueda vía pop
+        i = self._size
+        if i == self.capacity:
+            return False
+        
+        self._rows[object_id] = i
+        self.object_ids[i] = object_id
+        self.activation_times[i] = activation_time
+        self.created_times[i] = created_time
+        self.confidences[i] = confidence
+        self.categories[i] = category
+        self.classification_ids[i] = classification_id
+        self._size = i + 1
+        return True
+    
+    def remove(self, object_id: int) -> bool:
+        """Elimina un objeto moviendo la última fila a su hueco (O(1), sin realocar)"""
+        i = self._rows.pop(object_id, None)
+        if i is None:
+            return False
+        
+        last = self._size - 1
+        if i != last:
+            moved_id = self.object_ids[last]
+            for column in self._columns():
+                column[i] = column[last]
+            self._rows[moved_id] = i
+        
+        # Soltar referencias (Futures) de la fila liberada
+        self.categories[last] = None
+        self.classification_ids[last] = None
+        self._size = last
+        return True
+    
+    def clear(self) -> None:
+        """Vacía la tabla"""
+        for i in range(self._size):
+            self.categories[i] = None
+            self.classification_ids[i] = None
+        self._rows.clear()
+        self._size = 0
+
+
+class DiversionWriteBatcher:
+    """Agrupa en lotes las actualizaciones de estado de desviación en BD"""
+    
+    def __init__(self, components: 'ComponentManager', executor: ThreadPoolExecutor,
+                 max_batch: int = 64, flush_interval_s: float = 0.05, max_queue: int = 1000):
+        self.components = components
+        self.executor = executor
+        self.max_batch = max_batch
+        self.flush_interval_s = flush_interval_s
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._collecting: List[Dict[str, Any]] = []  # Lote en formación (se conserva si se cancela)
+    
+    def start(self) -> None:
+        """Inicia la tarea consumidora (llamar desde el event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name='DiversionWriteBatcher')
+    
+    def submit(self, update: Dict[str, Any]) -> None:
+        """Encola una actualización {classification_id, diverter_activated, actuation_time_ms, error_message}"""
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            logger.warning(f"Queue de actualizaciones de desviación llena, descartando {update.get('classification_id')}")
+    
+    async def stop(self) -> None:
+        """Detiene la tarea y escribe lo pendiente"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        
+        pending, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._write, pending)
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._collecting.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval_s
+            
+            while len(self._collecting) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._collecting.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            batch, self._collecting = self._collecting, []
+            await loop.run_in_executor(self.executor, self._write, batch)
+    
+    def _write(self, updates: List[Dict[str, Any]]) -> None:
+        """Escribe un lote (bloqueante): sin desviar en una sentencia, el resto en otra"""
+        database = self.components.database
+        if not database:
+            return
+        
+        not_diverted: List[int] = []
+        actuated: List[Dict[str, Any]] = []
+        for update in updates:
+            if update.get('diverter_activated') or update.get('error_message') or \
+                    update.get('actuation_time_ms') is not None:
+                actuated.append(update)
+            else:
+                not_diverted.append(update['classification_id'])
+        
+        try:
+            if not_diverted:
+                if hasattr(database, 'update_classification_diversion_status_bulk'):
+                    database.update_classification_diversion_status_bulk(not_diverted, diverter_activated=False)
+                else:
+                    actuated.extend({'classification_id': cid, 'diverter_activated': False} for cid in not_diverted)
+            
+            if actuated:
+                if hasattr(database, 'update_classification_diversion_status_many'):
+                    database.update_classification_diversion_status_many(actuated)
+                else:
+                    for update in actuated:
+                        database.update_classification_diversion_status(**update)
+        except Exception as e:
+            logger.warning(f"Error actualizando {len(updates)} desviaciones en BD: {e}")
+
+
+class EventLogWriter:
+    """Escribe eventos del sistema y estados de tolva en BD desde una tarea en segundo plano"""
+    
+    def __init__(self, components: 'ComponentManager', executor: ThreadPoolExecutor,
+                 max_queue: int = 500):
+        self.components = components
+        self.executor = executor
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Inicia la tarea consumidora (llamar desde el event loop)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name='EventLogWriter')
+    
+    def log_event(self, event_type: str, severity: str, message: str,
+                  details: Optional[Dict[str, Any]] = None) -> None:
+        """Encola un evento del sistema"""
+        self._put(('event', (event_type, severity, message, details)))
+    
+    def update_bin_status(self, bin_name: str, level: float, alert_triggered: bool) -> None:
+        """Encola la actualización del nivel de una tolva"""
+        self._put(('bin', (bin_name, level, alert_triggered)))
+    
+    def _put(self, item: Tuple[str, tuple]) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning(f"Queue de eventos de BD llena, descartando {item[0]}")
+    
+    async def stop(self) -> None:
+        """Detiene la tarea y escribe lo pendiente"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        
+        pending = self._drain()
+        if pending:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._write, pending)
+    
+    def _drain(self) -> List[Tuple[str, tuple]]:
+        items = []
+        while not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Todo lo acumulado mientras se escribía el lote anterior va en el siguiente
+            items = [await self._queue.get()]
+            items.extend(self._drain())
+            await loop.run_in_executor(self.executor, self._write, items)
+    
+    def _write(self, items: List[Tuple[str, tuple]]) -> None:
+        """Escribe un lote (bloqueante) agrupando por tipo"""
+        database = self.components.database
+        if not database:
+            return
+        
+        events = [args for kind, args in items if kind == 'event']
+        bins = [args for kind, args in items if kind == 'bin']
+        try:
+            if bins:
+                if hasattr(database, 'update_bin_status_many'):
+                    database.update_bin_status_many(bins)
+                else:
+                    for bin_args in bins:
+                        database.update_bin_status(*bin_args)
+            if events:
+                self.components._write_events(events)
+        except Exception as e:
+            logger.warning(f"Error escribiendo {len(items)} eventos en BD: {e}")
+
+
+class FrameGrabber:
+    """Hilo que vacía continuamente la cámara y conserva solo el frame más reciente (doble buffer)
+    
+    Con decode_on_demand el hilo solo hace grab() (sin decodificar) y decodifica únicamente
+    el frame que sigue a una petición: captura bajo demanda con cola de un frame.
+    """
+    
+    def __init__(self, camera: 'cv2.VideoCapture', decode_on_demand: bool = False):
+        self.camera = camera
+        self.decode_on_demand = decode_on_demand
+        self._lock = threading.Lock()
+        self._latest: Optional[np.ndarray] = None
+        self._latest_time = 0.0
+        self._spare: Optional[np.ndarray] = None  # Buffer donde se decodifica el siguiente frame
+        self._free: Optional[np.ndarray] = None  # Buffer cedido por take() para reutilizar como _spare
+        self._fresh = threading.Event()  # Hay un frame publicado que aún no se ha entregado con take()
+        self._ready = threading.Event()  # Primer frame disponible o hilo terminado
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Petición bajo demanda en curso: (buffer_destino,), identificada por identidad
+        self._request_lock = threading.Lock()
+        self._pending: Optional[tuple] = None
+        self._served = threading.Event()
+        self._result: Tuple[bool, Optional[np.ndarray]] = (False, None)
+    
+    def start(self) -> None:
+        """Inicia el hilo de captura"""
+        self._thread = threading.Thread(target=self._run, name='camera-grabber', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 1.0) -> None:
+        """Detiene el hilo; llamar antes de liberar la cámara"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def wait_ready(self, timeout: float) -> bool:
+        """Espera el primer frame (o el fin del hilo)"""
+        return self._ready.wait(timeout)
+    
+    def latest(self, out: Optional[np.ndarray] = None, max_age_s: float = 0.5) -> Optional[np.ndarray]:
+        """Copia del último frame (en `out` si es compatible); None si no hay uno reciente"""
+        with self._lock:
+            frame = self._latest
+            if frame is None or time.monotonic() - self._latest_time > max_age_s:
+                return None
+            if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+                np.copyto(out, frame)
+                return out
+            return frame.copy()
+    
+    def take(self, out: Optional[np.ndarray] = None, max_age_s: float = 0.5) -> Optional[np.ndarray]:
+        """Entrega el último frame sin copiarlo; `out` (compatible) pasa al hilo como buffer libre
+        
+        El frame entregado deja de ser del hilo: hasta el siguiente frame, take() y latest() dan None.
+        """
+        with self._lock:
+            frame = self._latest
+            if frame is None or time.monotonic() - self._latest_time > max_age_s:
+                return None
+            self._latest = None
+            self._fresh.clear()
+            if out is not None and out is not frame and out.shape == frame.shape and out.dtype == frame.dtype:
+                self._free = out
+            return frame
+    
+    def wait_next(self, timeout: float) -> bool:
+        """Espera un frame publicado y no entregado (bloqueante)"""
+        return self._fresh.wait(timeout)
+    
+    def request_frame(self, out: Optional[np.ndarray] = None,
+                      timeout: float = 0.5) -> Tuple[bool, Optional[np.ndarray]]:
+        """Decodifica el siguiente frame capturado en `out` (bloqueante, modo bajo demanda)"""
+        with self._request_lock:
+            with self._lock:
+                self._served.clear()
+                pending = self._pending = (out,)
+            
+            if self._served.wait(timeout):
+                with self._lock:
+                    return self._result
+            
+            with self._lock:
+                if self._pending is pending:
+                    self._pending = None
+                    return False, None
+                return self._result  # Servida justo al vencer el timeout
+    
+    def _run(self) -> None:
+        camera = self.camera
+        try:
+            while not self._stop.is_set():
+                if not camera.grab():
+                    self._stop.wait(0.01)
+                    continue
+                
+                if self.decode_on_demand:
+                    self._ready.set()
+                    pending = self._pending
+                    if pending is None:
+                        continue  # Frame descartado sin decodificar
+                    ok, frame = camera.retrieve(pending[0])
+                    with self._lock:
+                        if self._pending is pending:
+                            self._pending = None
+                            self._result = (bool(ok) and frame is not None, frame)
+                            self._served.set()
+                    continue
+                
+                ok, frame = camera.retrieve(self._spare)
+                if not ok or frame is None:
+                    continue
+                
+                with self._lock:
+                    # El frame anterior vuelve a ser destino; si se entregó, se usa el buffer cedido
+                    spare = self._latest
+                    if spare is None:
+                        spare, self._free = self._free, None
+                    self._spare = spare
+                    self._latest = frame
+                    self._latest_time = time.monotonic()
+                    self._fresh.set()
+                self._ready.set()
+        except Exception as e:
+            logger.warning(f"Hilo de captura de cámara detenido: {e}")
+        finally:
+            self._ready.set()
+            self._fresh.set()  # Despertar a quien espere wait_next()
+            with self._lock:
+                self._pending = None
+                self._result = (False, None)
+                self._served.set()
+
+
 class ErrorRecoveryManager:
     """Gestor de recuperación automática de errores"""
     
@@ -294,8 +873,7 @@ class ErrorRecoveryManager:
         """Estrategia de recuperación para fallos de cámara"""
         try:
             # Liberar cámara actual
-            if system.components.camera and system.components.camera.isOpened():
-                system.components.camera.release()
+            system.components.release_camera()
             
             await asyncio.sleep(1)
             
@@ -303,7 +881,7 @@ class ErrorRecoveryManager:
             await system.components._initialize_camera()
             
             # Probar captura
-            ret, frame = system.components.camera.read()
+            ret, frame = await asyncio.get_running_loop().run_in_executor(None, system.components.read_frame)
             return ret and frame is not None
             
         except Exception as e:
@@ -318,8 +896,9 @@ class ErrorRecoveryManager:
             
             # Probar clasificación dummy
             if system.components.ai_detector:
-                dummy_image = np.zeros((480, 640, 3), dtype=np.uint8)
-                detections = system.components.ai_detector.detect_objects(dummy_image)
+                await asyncio.get_running_loop().run_in_executor(
+                    system._inference_pool, system.components.ai_detector.detect_objects, _DUMMY_FRAME
+                )
                 return True  # Si no hay excepción, el modelo está funcionando
             
             return False
@@ -424,12 +1003,16 @@ class SecurityManager:
         self.api_keys = set()
         self.emergency_stop_active = False
         
+        # Evento señalizado por la interrupción del botón de emergencia
+        self.emergency_event = asyncio.Event()
+        self.edge_detection_enabled = False
+        
         # Cargar configuración de seguridad
         self._load_security_config()
     
     def _load_security_config(self):
         """Carga configuración de seguridad"""
-        safety_config = self.config.get('safety_settings', {})
+        safety_config = self.config.get('safety_settings') or {}
         self.emergency_stop_enabled = safety_config.get('emergency_stop_enabled', True)
         self.max_failed_attempts = safety_config.get('max_failed_attempts', 5)
         self.lockout_duration = safety_config.get('lockout_duration_minutes', 30)
@@ -445,6 +1028,28 @@ class SecurityManager:
         except:
             return False
     
+    def enable_emergency_stop_interrupt(self) -> bool:
+        """Registra detección por flanco del botón de emergencia (llamar desde el event loop)"""
+        if not self.emergency_stop_enabled:
+            return False
+        
+        loop = asyncio.get_running_loop()
+        
+        def _emergency_isr(channel):
+            # Ejecutado en el hilo de eventos de RPi.GPIO
+            loop.call_soon_threadsafe(self.emergency_event.set)
+        
+        try:
+            from Control_Banda.RPi_control_bajo_nivel import sensor_interface
+            self.edge_detection_enabled = bool(
+                sensor_interface.register_emergency_stop_callback(_emergency_isr)
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo registrar interrupción de parada de emergencia: {e}")
+            self.edge_detection_enabled = False
+        
+        return self.edge_detection_enabled
+    
     def validate_api_access(self, request_ip: str, api_key: str = None) -> bool:
         """Valida acceso a la API"""
         # Verificar IP bloqueada
@@ -452,7 +1057,7 @@ class SecurityManager:
             return False
         
         # Verificar API key si está habilitada
-        api_config = self.config.get('api_settings', {})
+        api_config = self.config.get('api_settings') or {}
         if api_config.get('api_key_required', False):
             if not api_key or api_key not in self.api_keys:
                 self._record_failed_attempt(request_ip)
@@ -495,9 +1100,33 @@ class PerformanceMonitor:
         self.memory_threshold = 85.0
         self.temp_threshold = 70.0
         self.processing_time_threshold = 5000.0  # ms
+        
+        self._thermal_fd = _open_thermal_fd()
+        
+        # Caché de la última muestra: llamadas dentro del TTL comparten la misma lectura
+        self.metrics_ttl_s = 1.0
+        self._cached_metrics: Optional[Tuple[float, Dict[str, float]]] = None
+        self._collect_lock = asyncio.Lock()
     
     async def collect_system_metrics(self) -> Dict[str, float]:
-        """Recolecta métricas del sistema"""
+        """Recolecta métricas del sistema (reutiliza la última muestra dentro del TTL)"""
+        cached = self._cached_metrics
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        
+        # Llamadas simultáneas esperan a la primera en lugar de volver a muestrear
+        async with self._collect_lock:
+            cached = self._cached_metrics
+            if cached and time.monotonic() < cached[0]:
+                return cached[1]
+            
+            metrics = await self._collect_fresh_metrics()
+            if metrics:
+                self._cached_metrics = (time.monotonic() + self.metrics_ttl_s, metrics)
+            return metrics
+    
+    async def _collect_fresh_metrics(self) -> Dict[str, float]:
+        """Toma una nueva muestra de métricas del sistema"""
         try:
             metrics = {
                 'timestamp': time.time(),
@@ -545,24 +1174,29 @@ class PerformanceMonitor:
     
     def _get_cpu_temperature(self) -> float:
         """Obtiene temperatura del CPU"""
+        if self._thermal_fd < 0:
+            return 0.0
         try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = float(f.read()) / 1000.0
-            return temp
-        except:
+            return float(os.pread(self._thermal_fd, 16, 0)) / 1000.0
+        except (OSError, ValueError):
             return 0.0
     
+    def close(self) -> None:
+        """Cierra el descriptor del sensor térmico"""
+        self._thermal_fd = _close_thermal_fd(self._thermal_fd)
+    
     def get_performance_summary(self) -> Dict[str, Any]:
         """Obtiene resumen de rendimiento"""
         if not self.metrics_history:
             return {}
         
-        recent_metrics = list(self.metrics_history)[-10:]
+        # Solo las 10 últimas muestras: recorrer el deque desde el final sin copiar el historial
+        recent_metrics = list(itertools.islice(reversed(self.metrics_history), 10))
         
         return {
-            'avg_cpu': sum(m['cpu_percent'] for m in recent_metrics) / len(recent_metrics),
-            'avg_memory': sum(m['memory_percent'] for m in recent_metrics) / len(recent_metrics),
-            'current_temp': recent_metrics[-1]['temperature'],
+            'avg_cpu': fmean(m['cpu_percent'] for m in recent_metrics),
+            'avg_memory': fmean(m['memory_percent'] for m in recent_metrics),
+            'current_temp': recent_metrics[0].get('temperature'),
             'recent_alerts': self.performance_alerts[-5:],
             'metrics_count': len(self.metrics_history)
         }
@@ -571,11 +1205,36 @@ class PerformanceMonitor:
 class ConfigManager:
     """Gestor centralizado de configuración con validación avanzada"""
     
+    # Esquema de validación inmutable, construido una vez para todas las instancias
+    _VALIDATION_SCHEMA: Mapping[str, Any] = MappingProxyType({
+        'required_sections': (
+            'camera_settings',
+            'ai_model_settings', 
+            'conveyor_belt_settings',
+            'sensors_settings',
+            'diverter_control_settings'
+        ),
+        'optional_sections': (
+            'database_settings',
+            'api_settings',
+            'monitoring_settings',
+            'safety_settings',
+            'calibration_settings'
+        ),
+        'version_requirements': MappingProxyType({
+            'min_version': '2.0',
+            'max_version': '3.0'
+        })
+    })
+    
     def __init__(self, config_file: str = 'Control_Banda/config_industrial.json'):
         self.config_file = config_file
         self._config: Dict[str, Any] = {}
         self._config_timestamp = 0
-        self._validation_schema = self._create_validation_schema()
+        self._config_hash: Optional[bytes] = None
+        self._validation_schema = self._VALIDATION_SCHEMA
+        self._watch_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
         self._load_and_validate()
     
     def _load_and_validate(self) -> None:
@@ -589,8 +1248,16 @@ class ConfigManager:
             if file_timestamp <= self._config_timestamp:
                 return
             
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                new_config = json.load(f)
+            with open(self.config_file, 'rb') as f:
+                raw_config = f.read()
+            
+            # Si solo cambió el mtime (p. ej. guardado sin cambios) no volver a parsear
+            config_hash = hashlib.blake2b(raw_config, digest_size=16).digest()
+            if config_hash == self._config_hash:
+                self._config_timestamp = file_timestamp
+                return
+            
+            new_config = orjson.loads(raw_config) if ORJSON_AVAILABLE else json.loads(raw_config)
             
             # Validar configuración
             self._validate_config(new_config)
@@ -601,6 +1268,7 @@ class ConfigManager:
             # Si llegamos aquí, la configuración es válida
             self._config = new_config
             self._config_timestamp = file_timestamp
+            self._config_hash = config_hash
             
             logger.info(f"Configuración cargada y validada desde {self.config_file}")
             
@@ -609,29 +1277,6 @@ class ConfigManager:
         except Exception as e:
             raise ConfigurationError(f"Error cargando configuración: {e}")
     
-    def _create_validation_schema(self) -> Dict[str, Any]:
-        """Crea esquema de validación para la configuración"""
-        return {
-            'required_sections': [
-                'camera_settings',
-                'ai_model_settings', 
-                'conveyor_belt_settings',
-                'sensors_settings',
-                'diverter_control_settings'
-            ],
-            'optional_sections': [
-                'database_settings',
-                'api_settings',
-                'monitoring_settings',
-                'safety_settings',
-                'calibration_settings'
-            ],
-            'version_requirements': {
-                'min_version': '2.0',
-                'max_version': '3.0'
-            }
-        }
-    
     def _validate_config(self, config: Dict[str, Any]) -> None:
         """Valida la estructura de configuración con esquema avanzado"""
         schema = self._validation_schema
@@ -701,10 +1346,10 @@ class ConfigManager:
     def reload_if_changed(self) -> bool:
         """Recarga configuración si el archivo ha cambiado"""
         try:
-            old_timestamp = self._config_timestamp
+            old_hash = self._config_hash
             self._load_and_validate()
             
-            if self._config_timestamp > old_timestamp:
+            if self._config_hash != old_hash:
                 logger.info("Configuración recargada automáticamente")
                 return True
             
@@ -714,6 +1359,45 @@ class ConfigManager:
             logger.error(f"Error recargando configuración: {e}")
             return False
     
+    def watch_for_changes(self, on_change: Callable[[], None]) -> bool:
+        """Vigila el archivo de configuración con inotify (False si no está disponible)"""
+        if not INOTIFY_AVAILABLE:
+            return False
+        
+        if self._watch_thread and self._watch_thread.is_alive():
+            return True
+        
+        try:
+            config_dir = os.path.dirname(os.path.abspath(self.config_file))
+            config_name = os.path.basename(self.config_file)
+            inotify = INotify()
+            # Se vigila el directorio para detectar también reemplazos atómicos (rename)
+            inotify.add_watch(config_dir, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+        except OSError as e:
+            logger.warning(f"No se pudo vigilar {self.config_file} con inotify: {e}")
+            return False
+        
+        def _watch_loop():
+            try:
+                while not self._watch_stop.is_set():
+                    events = inotify.read(timeout=1000)
+                    if any(event.name == config_name for event in events):
+                        on_change()
+            except Exception as e:
+                logger.error(f"Error vigilando configuración: {e}")
+            finally:
+                inotify.close()
+        
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=_watch_loop, daemon=True, name='ConfigWatcher')
+        self._watch_thread.start()
+        logger.info(f"Vigilando cambios en {self.config_file} con inotify")
+        return True
+    
+    def stop_watching(self) -> None:
+        """Detiene la vigilancia del archivo de configuración"""
+        self._watch_stop.set()
+    
     def get(self, section: str, key: str = None, default: Any = None) -> Any:
         """Obtiene un valor de configuración con validación"""
         # Verificar si necesita recargar
@@ -786,6 +1470,12 @@ class ConfigManager:
             self._validate_config(self._config)
         except ConfigurationError as e:
             errors.append(str(e))
+        
+        # Valores fuera de rango que se ajustan al cargar (no impiden el arranque)
+        duration = self._config.get('conveyor_belt_settings', {}).get('diverter_activation_duration_s', 0.75)
+        if not DIVERTER_DURATION_MIN_S <= duration <= DIVERTER_DURATION_MAX_S:
+            errors.append(f"Duración de activación fuera de rango: {duration}s "
+                          f"(se ajusta a [{DIVERTER_DURATION_MIN_S}, {DIVERTER_DURATION_MAX_S}])")
         return errors
 
 
@@ -795,12 +1485,15 @@ class ComponentManager:
     def __init__(self, config: ConfigManager):
         self.config = config
         self.camera: Optional[cv2.VideoCapture] = None
+        self.frame_grabber: Optional[FrameGrabber] = None
         self.ai_detector = None
         self.database = None
         self.api_server = None
         self.error_recovery: Optional[ErrorRecoveryManager] = None
         self.security_manager: Optional[SecurityManager] = None
         self.performance_monitor: Optional[PerformanceMonitor] = None
+        # Pool de inferencia del sistema (None: executor por defecto del loop)
+        self.inference_executor: Optional[ThreadPoolExecutor] = None
         
         self._components_initialized = False
         self._initialization_order = [
@@ -813,6 +1506,23 @@ class ComponentManager:
             'database_and_api'
         ]
         self._component_status = {}
+        
+        # Rutas de modelo ya verificadas (existencia y tamaño) -> tamaño en bytes
+        self._validated_model_sizes: Dict[str, int] = {}
+        
+        # Mapeos de clases precalculados al cargar el modelo (nombre -> índice -> categoría)
+        self.class_to_idx: Mapping[str, int] = MappingProxyType({})
+        self.idx_to_bucket: Optional[np.ndarray] = None
+        self._class_map_key: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
+        
+        # Último índice de cámara que funcionó (se prueba primero)
+        self._camera_hint: Optional[int] = self._load_camera_hint()
+        
+        # Eventos generados antes de que la base de datos esté lista (se escriben en orden)
+        self._pending_db_events: deque = deque(maxlen=1000)
+        
+        # Pines GPIO efectivamente configurados por sensores, banda y desviadores
+        self._claimed_pins: set = set()
     
     async def initialize_all(self) -> None:
         """Inicializa todos los componentes del sistema en orden"""
@@ -824,10 +1534,12 @@ class ComponentManager:
                     await self._initialize_component(component)
                     self._component_status[component] = 'initialized'
                     logger.info(f"Componente {component} inicializado correctamente")
+                    self.log_event('component_init', 'info', f'Componente {component} inicializado')
                     
                 except Exception as e:
                     self._component_status[component] = f'error: {str(e)}'
                     logger.error(f"Error inicializando {component}: {e}")
+                    self.log_event('component_init', 'error', f'Error inicializando {component}: {e}')
                     
                     # Algunos componentes son críticos
                     if component in ['hardware', 'camera', 'ai_model']:
@@ -872,20 +1584,24 @@ class ComponentManager:
         """Limpia componentes parcialmente inicializados"""
         logger.info("Limpiando inicialización parcial...")
         
-        # Limpiar en orden inverso
+        # Limpiar en orden inverso; un fallo en un componente no impide limpiar los demás
         for component in reversed(self._initialization_order):
-            if self._component_status.get(component) == 'initialized':
-                try:
-                    if component == 'camera' and self.camera:
-                        self.camera.release()
-                        self.camera = None
-                    elif component == 'hardware':
-                        GPIO.cleanup()
-                    
-                    self._component_status[component] = 'cleaned'
-                    
-                except Exception as e:
-                    logger.error(f"Error limpiando {component}: {e}")
+            try:
+                # Liberar solo los pines reclamados, aunque el hardware fallara a medias
+                if component == 'hardware' and self._claimed_pins:
+                    GPIO.cleanup(sorted(self._claimed_pins))
+                    self._claimed_pins.clear()
+                
+                if self._component_status.get(component) != 'initialized':
+                    continue
+                
+                if component == 'camera' and self.camera:
+                    self.release_camera()
+                
+                self._component_status[component] = 'cleaned'
+            
+            except Exception as e:
+                logger.error(f"Error limpiando {component}: {e}")
     
     async def _initialize_hardware(self) -> None:
         """Inicializa las interfaces de hardware con validación avanzada"""
@@ -902,40 +1618,37 @@ class ComponentManager:
             except Exception as e:
                 raise HardwareError(f"Error configurando GPIO: {e}", ErrorSeverity.CRITICAL, 'gpio')
             
-            # Inicializar sensores con reintentos
-            for attempt in range(3):
+            # Configuración ya parseada por ConfigManager, compartida por los tres
+            # módulos para no releer el archivo JSON en cada uno
+            full_config = self.config.get_all()
+            
+            # Sensores, banda y desviadores usan pines y secciones de configuración
+            # disjuntos, por lo que se inicializan de forma concurrente
+            results = await asyncio.gather(
+                self._initialize_sensors(band_sensors, full_config),
+                self._initialize_belt(belt_controller, full_config),
+                self._initialize_diverters(motor_driver_interface, full_config),
+                return_exceptions=True
+            )
+            
+            # Registrar los pines configurados, también los de subsistemas que fallaron a medias
+            for subsystem, module in (('sensores', band_sensors), ('banda', belt_controller),
+                                      ('desviadores', motor_driver_interface)):
                 try:
-                    if not band_sensors.load_sensor_config(self.config.config_file):
-                        raise HardwareError("Error cargando configuración de sensores")
-                    
-                    if not band_sensors.setup_sensor_gpio():
-                        raise HardwareError("Error configurando GPIOs de sensores")
-                    
-                    break
-                    
+                    self._claimed_pins.update(module.get_claimed_pins())
                 except Exception as e:
-                    if attempt == 2:  # Último intento
-                        raise HardwareError(f"Error en sensores después de 3 intentos: {e}", 
-                                          ErrorSeverity.HIGH, 'sensors')
-                    await asyncio.sleep(1)
-            
-            # Inicializar control de banda
-            if not belt_controller.load_belt_config(self.config.config_file):
-                raise HardwareError("Error cargando configuración de banda", 
-                                  ErrorSeverity.HIGH, 'conveyor_belt')
-            
-            if not belt_controller.setup_belt_gpio():
-                raise HardwareError("Error configurando GPIOs de banda", 
-                                  ErrorSeverity.HIGH, 'conveyor_belt')
+                    logger.warning(f"No se pudieron obtener pines de {subsystem}: {e}")
             
-            # Inicializar actuadores de desviación
-            if not motor_driver_interface.load_diverter_configuration(self.config.config_file):
-                raise HardwareError("Error cargando configuración de desviadores", 
-                                  ErrorSeverity.HIGH, 'diverters')
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if len(errors) == 1 and isinstance(errors[0], HardwareError):
+                raise errors[0]
+            if errors:
+                raise HardwareError(f"Errores inicializando hardware: {'; '.join(str(e) for e in errors)}",
+                                  ErrorSeverity.HIGH, 'hardware')
             
-            if not motor_driver_interface.setup_diverter_gpio():
-                raise HardwareError("Error configurando GPIOs de desviadores", 
-                                  ErrorSeverity.HIGH, 'diverters')
+            # Parada de emergencia por interrupción en lugar de sondeo
+            if self.security_manager:
+                self.security_manager.enable_emergency_stop_interrupt()
             
             logger.info("Hardware inicializado correctamente")
             
@@ -943,52 +1656,85 @@ class ComponentManager:
             raise HardwareError(f"Error importando módulos de hardware: {e}", 
                               ErrorSeverity.CRITICAL, 'imports')
     
+    async def _initialize_sensors(self, band_sensors, full_config: Dict[str, Any]) -> None:
+        """Inicializa los sensores de la banda con reintentos"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(3):
+            try:
+                if not await loop.run_in_executor(None, band_sensors.load_sensor_config_from_dict, full_config):
+                    raise HardwareError("Error cargando configuración de sensores")
+                
+                if not await loop.run_in_executor(None, band_sensors.setup_sensor_gpio):
+                    raise HardwareError("Error configurando GPIOs de sensores")
+                
+                return
+            
+            except Exception as e:
+                if attempt == 2:  # Último intento
+                    raise HardwareError(f"Error en sensores después de 3 intentos: {e}",
+                                      ErrorSeverity.HIGH, 'sensors')
+                await asyncio.sleep(1)
+    
+    async def _initialize_belt(self, belt_controller, full_config: Dict[str, Any]) -> None:
+        """Inicializa el control de la banda transportadora"""
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, belt_controller.load_belt_config_from_dict, full_config):
+            raise HardwareError("Error cargando configuración de banda",
+                              ErrorSeverity.HIGH, 'conveyor_belt')
+        
+        if not await loop.run_in_executor(None, belt_controller.setup_belt_gpio):
+            raise HardwareError("Error configurando GPIOs de banda",
+                              ErrorSeverity.HIGH, 'conveyor_belt')
+    
+    async def _initialize_diverters(self, motor_driver_interface, full_config: Dict[str, Any]) -> None:
+        """Inicializa los actuadores de desviación"""
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, motor_driver_interface.load_diverter_configuration_from_dict,
+                                                full_config):
+            raise HardwareError("Error cargando configuración de desviadores",
+                              ErrorSeverity.HIGH, 'diverters')
+        
+        if not await loop.run_in_executor(None, motor_driver_interface.setup_diverter_gpio):
+            raise HardwareError("Error configurando GPIOs de desviadores",
+                              ErrorSeverity.HIGH, 'diverters')
+    
     async def _initialize_camera(self) -> None:
         """Inicializa la cámara con configuración avanzada"""
+        loop = asyncio.get_running_loop()
         try:
             cam_settings = self.config.get('camera_settings')
             cam_index = cam_settings.get('index', 0)
             width = cam_settings.get('frame_width', 640)
             height = cam_settings.get('frame_height', 480)
             
-            # Intentar varios índices de cámara si falla
+            # Intentar varios índices de cámara si falla, empezando por el último que funcionó
             camera_indices = [cam_index, 0, 1, 2] if cam_index != 0 else [0, 1, 2]
-            
-            for idx in camera_indices:
-                try:
-                    self.camera = cv2.VideoCapture(idx)
-                    if self.camera.isOpened():
-                        cam_index = idx
-                        break
-                    self.camera.release()
-                except:
-                    continue
+            if self._camera_hint is not None:
+                camera_indices = [self._camera_hint] + [i for i in camera_indices if i != self._camera_hint]
+            
+            # Pipeline GStreamer (appsink drop=true max-buffers=1): latencia de un frame en la Pi
+            pipeline = cam_settings.get('gstreamer_pipeline')
+            if pipeline is True:
+                pipeline = DEFAULT_GSTREAMER_PIPELINE.format(
+                    index=cam_index, width=width, height=height, fps=cam_settings.get('fps', 30)
+                )
+            if pipeline and await loop.run_in_executor(None, self._open_gstreamer_camera, pipeline):
+                cam_index = 'gstreamer'
             else:
-                raise HardwareError("No se encontró ninguna cámara disponible", 
-                                  ErrorSeverity.CRITICAL, 'camera')
-            
-            # Configurar propiedades de cámara
-            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-            
-            # Configuraciones opcionales
-            if 'fps' in cam_settings:
-                self.camera.set(cv2.CAP_PROP_FPS, cam_settings['fps'])
-            
-            if not cam_settings.get('autofocus', True):
-                self.camera.set(cv2.CAP_PROP_AUTOFOCUS, 0)
-            
-            if 'exposure' in cam_settings:
-                self.camera.set(cv2.CAP_PROP_EXPOSURE, cam_settings['exposure'])
-            
-            if 'brightness' in cam_settings:
-                self.camera.set(cv2.CAP_PROP_BRIGHTNESS, cam_settings['brightness'])
-            
-            if 'contrast' in cam_settings:
-                self.camera.set(cv2.CAP_PROP_CONTRAST, cam_settings['contrast'])
+                # Abrir y configurar en un hilo para no bloquear el event loop
+                opened_index = await loop.run_in_executor(
+                    None, self._open_camera, camera_indices, cam_settings, width, height
+                )
+                if opened_index is None:
+                    raise HardwareError("No se encontró ninguna cámara disponible", 
+                                      ErrorSeverity.CRITICAL, 'camera')
+                
+                cam_index = opened_index
+                self._save_camera_hint(cam_index)
             
             # Probar captura
-            for _ in range(cam_settings.get('warmup_frames', 5)):
+            # Con buffer de un frame no hay frames viejos que drenar
+            for _ in range(cam_settings.get('warmup_frames', 2)):
                 ret, frame = self.camera.read()
                 if not ret:
                     raise HardwareError("Error en captura de prueba de cámara", 
@@ -1002,6 +1748,13 @@ class ComponentManager:
                 logger.warning(f"Resolución de cámara diferente a la solicitada: "
                              f"{actual_width}x{actual_height} vs {width}x{height}")
             
+            # Hilo que mantiene siempre el frame más reciente (los backends re-bufferizan entre triggers)
+            if cam_settings.get('background_grabber', True):
+                self.frame_grabber = FrameGrabber(
+                    self.camera, decode_on_demand=cam_settings.get('decode_on_demand', True)
+                )
+                self.frame_grabber.start()
+            
             logger.info(f"Cámara inicializada: Índice {cam_index}, Resolución {actual_width}x{actual_height}")
             
         except Exception as e:
@@ -1009,6 +1762,118 @@ class ComponentManager:
                 raise
             raise HardwareError(f"Error inicializando cámara: {e}", ErrorSeverity.HIGH, 'camera')
     
+    def _open_camera(self, camera_indices: List[int], cam_settings: Dict[str, Any],
+                     width: int, height: int) -> Optional[int]:
+        """Abre la primera cámara disponible y aplica sus propiedades (bloqueante)"""
+        idx = self._probe_camera(camera_indices)
+        if idx is None:
+            return None
+        
+        # Buffer de un solo frame para que read() devuelva siempre el más reciente
+        if not self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+            logger.warning("El backend de cámara no admite CAP_PROP_BUFFERSIZE; "
+                           "se descartarán frames viejos con grab() en cada captura")
+        
+        # MJPG reduce el ancho de banda USB frente a YUYV; se ignora si no se soporta
+        # (antes de fijar la resolución: algunos drivers solo ofrecen 640x480+ en MJPG)
+        fourcc = cam_settings.get('fourcc', 'MJPG')
+        if fourcc:
+            requested = cv2.VideoWriter_fourcc(*fourcc)
+            self.camera.set(cv2.CAP_PROP_FOURCC, requested)
+            if int(self.camera.get(cv2.CAP_PROP_FOURCC)) != requested:
+                logger.warning(f"La cámara no aceptó el formato {fourcc}; se usa el formato por defecto del driver")
+        
+        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        
+        for prop, key in CAMERA_PROPERTIES:
+            if key in cam_settings:
+                self.camera.set(prop, cam_settings[key])
+        
+        if not cam_settings.get('autofocus', True):
+            self.camera.set(cv2.CAP_PROP_AUTOFOCUS, 0)
+        
+        return idx
+    
+    def read_frame(self, timeout: float = 1.0) -> Tuple[bool, Optional[np.ndarray]]:
+        """Lee un frame de prueba, del hilo de captura si está activo (bloqueante)"""
+        grabber = self.frame_grabber
+        if grabber is not None:
+            grabber.wait_ready(timeout)
+            if grabber.decode_on_demand and grabber.is_alive():
+                return grabber.request_frame(timeout=timeout)
+            frame = grabber.latest()
+            if frame is None and grabber.is_alive() and grabber.wait_next(timeout):
+                frame = grabber.latest()  # El último se entregó a la captura: esperar el siguiente
+            if frame is not None:
+                return True, frame
+            if grabber.is_alive():
+                return False, None
+        return self.camera.read()
+    
+    def release_camera(self) -> None:
+        """Detiene el hilo de captura y libera la cámara"""
+        if self.frame_grabber is not None:
+            self.frame_grabber.stop()
+            self.frame_grabber = None
+        if self.camera is not None:
+            if self.camera.isOpened():
+                self.camera.release()
+            self.camera = None
+    
+    def _open_gstreamer_camera(self, pipeline: str) -> bool:
+        """Abre la cámara con un pipeline GStreamer; False si no se pudo (bloqueante)"""
+        try:
+            camera = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        except Exception as e:
+            logger.warning(f"Error abriendo pipeline GStreamer: {e}")
+            return False
+        
+        if not camera.isOpened():
+            camera.release()
+            logger.warning("No se pudo abrir el pipeline GStreamer (¿OpenCV sin soporte GStreamer?); "
+                           "se usa V4L2 por índice")
+            return False
+        
+        # Resolución y formato los fija el propio pipeline
+        self.camera = camera
+        return True
+    
+    def _probe_camera(self, camera_indices: List[int]) -> Optional[int]:
+        """Abre la primera cámara disponible de la lista (bloqueante, se ejecuta en un hilo)"""
+        for idx in camera_indices:
+            try:
+                self.camera = cv2.VideoCapture(idx, cv2.CAP_V4L2)
+                if self.camera.isOpened():
+                    return idx
+                self.camera.release()
+            except:
+                continue
+        return None
+    
+    def _load_camera_hint(self) -> Optional[int]:
+        """Carga el último índice de cámara que abrió correctamente"""
+        try:
+            with open(CAMERA_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return int(json.load(f)['index'])
+        except Exception:
+            return None
+    
+    def _save_camera_hint(self, index: int) -> None:
+        """Persiste de forma atómica el índice de cámara que funcionó"""
+        if index == self._camera_hint:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(CAMERA_CACHE_FILE), exist_ok=True)
+            tmp_file = f"{CAMERA_CACHE_FILE}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'index': index}, f)
+            os.replace(tmp_file, CAMERA_CACHE_FILE)
+            self._camera_hint = index
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el índice de cámara: {e}")
+    
     async def _initialize_ai_model(self) -> None:
         """Inicializa el modelo de IA con validación"""
         try:
@@ -1018,19 +1883,27 @@ class ComponentManager:
             model_path = ai_settings['model_path']
             min_confidence = ai_settings.get('min_confidence', 0.5)
             
-            # Verificar archivo del modelo
-            if not os.path.exists(model_path):
-                raise AIError(f"Archivo del modelo no encontrado: {model_path}", 
-                            ErrorSeverity.CRITICAL, 'ai_model')
-            
-            # Verificar tamaño del archivo
-            model_size = os.path.getsize(model_path)
-            if model_size < 1024:  # Menos de 1KB probablemente sea inválido
-                raise AIError(f"Archivo del modelo parece inválido (tamaño: {model_size} bytes)", 
-                            ErrorSeverity.CRITICAL, 'ai_model')
-            
-            # Inicializar detector
-            self.ai_detector = TrashDetector(model_path, min_confidence)
+            # Verificar archivo del modelo (solo la primera vez; los reinicios reutilizan el resultado)
+            if model_path not in self._validated_model_sizes:
+                if not os.path.exists(model_path):
+                    raise AIError(f"Archivo del modelo no encontrado: {model_path}", 
+                                ErrorSeverity.CRITICAL, 'ai_model')
+                
+                # Verificar tamaño del archivo
+                model_size = os.path.getsize(model_path)
+                if model_size < 1024:  # Menos de 1KB probablemente sea inválido
+                    raise AIError(f"Archivo del modelo parece inválido (tamaño: {model_size} bytes)", 
+                                ErrorSeverity.CRITICAL, 'ai_model')
+                
+                self._validated_model_sizes[model_path] = model_size
+            
+            # Inicializar detector (torch, o modelo exportado a ONNX/OpenVINO para CPU)
+            self.ai_detector = TrashDetector(
+                model_path, min_confidence,
+                backend=ai_settings.get('backend', 'torch'),
+                int8=ai_settings.get('int8', False),
+                calibration_data=ai_settings.get('calibration_data')
+            )
             
             # Validar clases del modelo
             if not hasattr(self.ai_detector, 'model_class_names') or not self.ai_detector.model_class_names:
@@ -1040,18 +1913,17 @@ class ComponentManager:
             logger.info(f"Modelo de IA cargado desde {model_path}")
             logger.info(f"Clases detectables: {self.ai_detector.model_class_names}")
             
-            # Validar compatibilidad entre clases del modelo y configuración
-            model_classes = set(self.ai_detector.model_class_names)
-            config_classes = set(ai_settings['class_names'])
-            
-            missing_classes = config_classes - model_classes - {'other', 'Desconocido', 'ErrorClase', 'ErrorIA'}
-            if missing_classes:
-                logger.warning(f"Clases en config no disponibles en modelo: {missing_classes}")
+            # Validar clases y precalcular mapeos solo si cambiaron (los reinicios los reutilizan)
+            class_map_key = (tuple(self.ai_detector.model_class_names), tuple(ai_settings['class_names']))
+            if class_map_key != self._class_map_key:
+                self._build_class_maps(*class_map_key)
+                self._class_map_key = class_map_key
             
             # Prueba de inferencia
             try:
-                dummy_image = np.zeros((480, 640, 3), dtype=np.uint8)
-                detections = self.ai_detector.detect_objects(dummy_image)
+                await asyncio.get_running_loop().run_in_executor(
+                    self.inference_executor, self.ai_detector.detect_objects, _DUMMY_FRAME
+                )
                 logger.info("Prueba de inferencia exitosa")
             except Exception as e:
                 raise AIError(f"Fallo en prueba de inferencia: {e}", 
@@ -1066,6 +1938,63 @@ class ComponentManager:
             raise AIError(f"Error inicializando modelo de IA: {e}", 
                         ErrorSeverity.HIGH, 'ai_model')
     
+    def log_event(self, event_type: str, severity: str, message: str,
+                  details: Optional[Dict[str, Any]] = None) -> None:
+        """Registra un evento del sistema; se encola si la base de datos no está lista"""
+        event = (event_type, severity, message, details)
+        if self.database is None:
+            self._pending_db_events.append(event)
+            return
+        self.database.log_system_event(*event)
+    
+    async def _flush_pending_db_events(self) -> None:
+        """Escribe los eventos pendientes en un solo lote, en el orden en que ocurrieron"""
+        if not self._pending_db_events:
+            return
+        
+        events = list(self._pending_db_events)
+        self._pending_db_events.clear()
+        await asyncio.get_running_loop().run_in_executor(None, self._write_events, events)
+    
+    def _write_events(self, events: List[tuple]) -> None:
+        """Escribe una lista de eventos en la base de datos (bloqueante)"""
+        if hasattr(self.database, 'log_many'):
+            self.database.log_many(events)
+            return
+        for event in events:
+            self.database.log_system_event(*event)
+    
+    def _build_class_maps(self, model_class_names: Tuple[str, ...],
+                          system_class_names: Tuple[str, ...]) -> None:
+        """Valida las clases del modelo y congela los mapeos clase -> categoría del sistema"""
+        missing_classes = set(system_class_names) - set(model_class_names) - SENTINEL_CLASSES
+        if missing_classes:
+            logger.warning(f"Clases en config no disponibles en modelo: {missing_classes}")
+        
+        system_idx = {name: i for i, name in enumerate(system_class_names)}
+        fallback_idx = system_idx.get('other', system_idx.get('Desconocido', -1))
+        
+        self.class_to_idx = MappingProxyType({name: i for i, name in enumerate(model_class_names)})
+        self.idx_to_bucket = np.array(
+            [system_idx.get(name, fallback_idx) for name in model_class_names], dtype=np.int16
+        )
+        self.idx_to_bucket.setflags(write=False)
+    
+    @staticmethod
+    def _wait_port_open(host: str, port: int, timeout: float) -> bool:
+        """Espera hasta que el puerto acepte conexiones TCP (bloqueante)"""
+        target = '127.0.0.1' if host in ('0.0.0.0', '') else host
+        deadline = time.monotonic() + timeout
+        
+        while time.monotonic() < deadline:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(0.2)
+                if sock.connect_ex((target, port)) == 0:
+                    return True
+            time.sleep(0.05)
+        
+        return False
+    
     async def _initialize_database_and_api(self) -> None:
         """Inicializa la base de datos y API con manejo de errores mejorado"""
         try:
@@ -1079,6 +2008,9 @@ class ComponentManager:
                 # Verificar conexión
                 self.database.log_system_event('startup', 'info', 'Sistema EcoSort v2.1 iniciado')
                 
+                # Volcar en orden los eventos acumulados durante la inicialización
+                await self._flush_pending_db_events()
+                
                 logger.info("Base de datos inicializada correctamente")
                 
             except Exception as e:
@@ -1086,7 +2018,7 @@ class ComponentManager:
                 self.database = None
             
             # Inicializar API si está habilitada
-            api_config = self.config.get('api_settings', {})
+            api_config = self.config.get('api_settings') or {}
             if api_config.get('enabled', True):
                 try:
                     host = api_config.get('host', '0.0.0.0')
@@ -1106,8 +2038,12 @@ class ComponentManager:
                     )
                     api_thread.start()
                     
-                    # Esperar a que inicie
-                    await asyncio.sleep(1)
+                    # Esperar a que el puerto acepte conexiones en lugar de un retardo fijo
+                    api_ready = await asyncio.get_running_loop().run_in_executor(
+                        None, self._wait_port_open, host, port, api_config.get('startup_timeout_s', 3.0)
+                    )
+                    if not api_ready:
+                        logger.warning(f"API no respondió en {host}:{port} dentro del tiempo de espera")
                     
                     logger.info(f"API inicializada en http://{host}:{port}")
                     
@@ -1136,8 +2072,7 @@ class ComponentManager:
             
             # Limpiar componente actual
             if component == 'camera' and self.camera:
-                self.camera.release()
-                self.camera = None
+                self.release_camera()
             
             # Reinicializar
             await self._initialize_component(component)
@@ -1162,13 +2097,110 @@ class EcoSortSystem:
         self.metrics = SystemMetrics()
         
         # Control de ejecución
-        self._running = False
-        self._shutdown_event = threading.Event()
-        self._maintenance_mode = False
+        self._flags = 0
+        self._flags_lock = threading.Lock()
+        self._shutdown = asyncio.Event()
+        self._state_changed = asyncio.Event()  # Transiciones de modo (mantenimiento/pausa)
+        self._thermal_fd = _open_thermal_fd()
+        self._loop_now = time.monotonic()
+        
+        # Disparo de cámara por interrupción GPIO (con sondeo como respaldo)
+        self._trigger_event = asyncio.Event()
+        self._trigger_interrupts = False
+        self._check_camera_trigger: Optional[Callable[[], bool]] = None
+        
+        # Módulos de hardware, enlazados en initialize() para no importar por objeto
+        self._motor_driver = None
+        self._band_sensors = None
+        
+        # Escritura de capturas fuera del event loop (un solo hilo conserva el orden)
+        self._image_writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='img-writer')
+        self._disk_space_ok = True
+        self._last_disk_check = float('-inf')
+        self._pending_image_writes = 0
+        self._max_pending_image_writes = 32
+        # Nombres de captura: marca de la sesión + secuencia (sin strftime por imagen ni colisiones)
+        self._session_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._capture_seq = itertools.count()
+        self._jpeg = None
+        self._jpeg_params: List[int] = []  # Parámetros de cv2.imencode, reconstruidos solo si cambia la calidad
+        if TURBOJPEG_AVAILABLE:
+            try:
+                self._jpeg = TurboJPEG()
+            except Exception as e:
+                logger.warning(f"libjpeg-turbo no disponible, usando OpenCV para capturas: {e}")
+        
+        # Hilos para llamadas bloqueantes a actuadores (acotados, no uno por objeto):
+        # uno por worker de desviación más dos para captura y sensores de tolva
+        self._num_diversion_workers = self._diversion_worker_count()
+        self._hw_pool = DiscardableExecutor(max_workers=self._num_diversion_workers + 2,
+                                           thread_name_prefix='hw')
+        
+        # Buffer de captura reutilizado entre frames (se asigna en la primera lectura)
+        self._capture_buf: Optional[np.ndarray] = None
+        
+        # Pipeline captura -> inferencia: queue mínima entre etapas y buffers de frame rotativos
+        # (un frame en cola no puede reutilizarse como destino de la siguiente captura)
+        # Los frames acumulados mientras el modelo está ocupado se infieren en un solo lote
+        self._max_inference_batch = max(1, int(self.config.get('ai_model_settings', 'max_batch_size', 4)))
+        self._inference_queue: asyncio.Queue = asyncio.Queue(maxsize=max(2, self._max_inference_batch))
+        self._frame_pool: deque = deque(maxlen=self._inference_queue.maxsize + 2)
+        self._inference_task = None
+        
+        # Inferencia fuera del event loop; un solo hilo porque el detector tiene estado
+        self._inference_pool = DiscardableExecutor(max_workers=1, thread_name_prefix='ai')
+        self.components.inference_executor = self._inference_pool
         
-        # Queue para objetos detectados con límite
-        self.object_queue: deque = deque(maxlen=100)
-        self.active_diversions: Dict[int, Dict[str, Any]] = {}
+        # Registro de clasificaciones en BD por lotes desde una tarea en segundo plano
+        self._db_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self._db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._db_writer_task = None
+        self._metrics_report_task = None
+        self._bin_monitor_task = None
+        self._diversion_writer = DiversionWriteBatcher(self.components, self._db_pool)
+        self._event_log = EventLogWriter(self.components, self._db_pool)
+        # object_id -> Future con el id de BD, hasta que la desviación lo reclame
+        self._pending_db_ids: 'OrderedDict[int, asyncio.Future]' = OrderedDict()
+        
+        # Queue para objetos detectados con límite; un consumidor agenda sus desviaciones al llegar
+        self.object_queue = DetectionRing(capacity=100)
+        self._object_ready = asyncio.Event()
+        self._object_queue_task = None
+        self.active_diversions = DiversionTable(
+            capacity=self.config.get('system_settings', 'max_concurrent_diversions', 256)
+        )
+        # Agenda única de desviaciones: (instante_activación_monotónico, object_id)
+        self._diversion_heap: List[Tuple[float, int]] = []
+        # Temporizador único de desviaciones, despertado al agendar una nueva cabeza del heap
+        self._diversion_wakeup = asyncio.Event()
+        self._diversion_scheduler_task = None
+        # Desviaciones vencidas, ejecutadas por un pool fijo de workers
+        self._div_queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._diversion_workers: List[asyncio.Task] = []
+        
+        # Trabajo pendiente desde la última actualización periódica
+        self._metrics_dirty = False
+        # Los sensores de tolva (ultrasónicos) solo admiten sondeo: las desviaciones
+        # despiertan al monitor de tolvas en lugar de un intervalo fijo
+        self._bin_check_event = asyncio.Event()
+        self._diverted_bins: Set[str] = set()  # Tolvas con objetos desviados desde la última lectura
+        
+        # Último nivel reportado y banda (0 normal, 1 alerta, 2 crítica) por tolva
+        self._last_bin_levels: Dict[str, float] = {}
+        self._bin_bands: Dict[str, int] = {}
+        # Plantillas de mensajes de alerta por tolva (aviso, crítica), con el nombre ya fijado
+        self._bin_alert_templates: Dict[str, Tuple[str, str]] = {}
+        
+        # Últimos tiempos de procesamiento (ms); el promedio se calcula en _update_metrics
+        self._recent_times: deque = deque(maxlen=256)
+        
+        # Caché de la parte costosa de get_status, invalidada por generación
+        self._status_gen = 0
+        self._status_cache_gen = -1
+        self._status_cache: Optional[Dict[str, Any]] = None
+        
+        # Mapeo nombre de clase -> índice del sistema (se reconstruye al recargar config)
+        self._refresh_class_index()
         self.last_object_id = 0
         
         # Monitoreo de rendimiento
@@ -1179,10 +2211,14 @@ class EcoSortSystem:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
-        self.start_time = time.time()
+        self.start_time = time.time()  # Hora de arranque (reloj de pared, solo informativa)
+        self._start_ns = time.monotonic_ns()  # Base monotónica para el uptime
         
         # Configuración de logging específica para esta instancia
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        
+        # Valores de configuración usados por objeto/iteración, precalculados
+        self._refresh_cached_config()
     
     def _signal_handler(self, signum: int, frame) -> None:
         """Maneja señales del sistema para shutdown graceful"""
@@ -1199,6 +2235,7 @@ class EcoSortSystem:
             
             # Inicializar componentes
             await self.components.initialize_all()
+            self._bind_hardware_modules()
             
             # Verificar configuración post-inicialización
             await self._post_initialization_checks()
@@ -1213,6 +2250,7 @@ class EcoSortSystem:
             self.state = SystemState.ERROR
             self.metrics.last_error = str(e)
             self.metrics.last_error_time = datetime.now()
+            self._status_gen += 1
             
             # Intentar recuperación automática si es posible
             if self.components.error_recovery:
@@ -1235,35 +2273,37 @@ class EcoSortSystem:
     
     async def _check_system_requirements(self) -> None:
         """Verifica requisitos del sistema antes de inicializar"""
+        loop = asyncio.get_running_loop()
+        # Lecturas independientes (statvfs, /proc, sysfs) en paralelo
+        disk_usage, memory, temp = await asyncio.gather(
+            loop.run_in_executor(None, psutil.disk_usage, '/'),
+            loop.run_in_executor(None, psutil.virtual_memory),
+            loop.run_in_executor(None, self._get_cpu_temperature)
+        )
+        
         # Verificar espacio en disco
-        disk_usage = psutil.disk_usage('/')
         free_gb = disk_usage.free / (1024**3)
         if free_gb < 1:  # Menos de 1GB libre
             raise SystemError("Espacio en disco insuficiente", ErrorSeverity.HIGH, 'storage')
         
         # Verificar memoria disponible
-        memory = psutil.virtual_memory()
         if memory.available < 512 * 1024 * 1024:  # Menos de 512MB
             raise SystemError("Memoria RAM insuficiente", ErrorSeverity.HIGH, 'memory')
         
-        # Verificar temperatura
-        try:
-            temp = self._get_cpu_temperature()
-            if temp > 80:
-                raise SystemError(f"Temperatura CPU muy alta: {temp}°C", 
-                                ErrorSeverity.HIGH, 'temperature')
-        except:
-            pass  # Sensor de temperatura no disponible
+        # Verificar temperatura (0.0 si el sensor no está disponible)
+        if temp > 80:
+            raise SystemError(f"Temperatura CPU muy alta: {temp}°C", 
+                            ErrorSeverity.HIGH, 'temperature')
         
         self.logger.info(f"Requisitos del sistema verificados - Disco: {free_gb:.1f}GB, RAM: {memory.available/(1024**2):.0f}MB")
     
     def _get_cpu_temperature(self) -> float:
         """Obtiene temperatura del CPU"""
+        if self._thermal_fd < 0:
+            return 0.0
         try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = float(f.read()) / 1000.0
-            return temp
-        except:
+            return float(os.pread(self._thermal_fd, 16, 0)) / 1000.0
+        except (OSError, ValueError):
             return 0.0
     
     async def _post_initialization_checks(self) -> None:
@@ -1277,9 +2317,11 @@ class EcoSortSystem:
         
         # Probar captura y clasificación
         try:
-            ret, frame = self.components.camera.read()
+            ret, frame = await asyncio.get_running_loop().run_in_executor(None, self.components.read_frame)
             if ret and frame is not None:
-                detections = self.components.ai_detector.detect_objects(frame)
+                await asyncio.get_running_loop().run_in_executor(
+                    self._inference_pool, self.components.ai_detector.detect_objects, frame
+                )
                 self.logger.info("Prueba de captura y clasificación exitosa")
             else:
                 raise HardwareError("Error en prueba de captura", ErrorSeverity.HIGH, 'camera')
@@ -1305,10 +2347,61 @@ class EcoSortSystem:
             self._security_task = asyncio.create_task(
                 self._security_check_loop()
             )
+        
+        # Escritores por lotes de clasificaciones y de estado de desviaciones
+        self._db_writer_task = asyncio.create_task(
+            self._db_writer_loop()
+        )
+        self._diversion_writer.start()
+        self._event_log.start()
+        self._start_diversion_workers()
+        self._diversion_scheduler_task = asyncio.create_task(
+            self._diversion_scheduler(), name='DiversionScheduler'
+        )
+        self._inference_task = asyncio.create_task(self._inference_stage(), name='InferenceStage')
+        self._object_queue_task = asyncio.create_task(
+            self._object_queue_consumer(), name='ObjectQueueConsumer'
+        )
+        
+        # Reporte periódico de métricas
+        self._metrics_report_task = asyncio.create_task(
+            self._metrics_reporter()
+        )
+        
+        # Niveles de tolva, despertado por las desviaciones
+        self._bin_monitor_task = asyncio.create_task(
+            self._bin_level_monitor()
+        )
+    
+    def _update_flags(self, set_mask: int = 0, clear_mask: int = 0) -> None:
+        """Activa/desactiva bits de estado de forma atómica respecto a otros hilos"""
+        with self._flags_lock:
+            self._flags = (self._flags & ~clear_mask) | set_mask
+    
+    def _alive(self) -> bool:
+        """Indica si el sistema está en marcha y no se ha solicitado shutdown"""
+        return (self._flags & (FLAG_RUNNING | FLAG_SHUTDOWN)) == FLAG_RUNNING
+    
+    async def _wait_for_shutdown(self, timeout: Optional[float] = None,
+                                 event: Optional[asyncio.Event] = None) -> bool:
+        """Espera el shutdown (o `event`) hasta `timeout` segundos; True si hay shutdown"""
+        waiters = [asyncio.ensure_future(self._shutdown.wait())]
+        if event is not None:
+            waiters.append(asyncio.ensure_future(event.wait()))
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return self._shutdown.is_set()
     
     async def _performance_monitoring_loop(self) -> None:
         """Bucle de monitoreo de rendimiento"""
-        while self._running and not self._shutdown_event.is_set():
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        
+        while not self._shutdown.is_set():
+            interval = 10  # Cada 10 segundos
             try:
                 if self.components.performance_monitor:
                     metrics = await self.components.performance_monitor.collect_system_metrics()
@@ -1317,34 +2410,60 @@ class EcoSortSystem:
                     self.metrics.cpu_usage_percent = metrics.get('cpu_percent', 0)
                     self.metrics.memory_usage_percent = metrics.get('memory_percent', 0)
                     self.metrics.temperature_celsius = metrics.get('temperature', 0)
-                
-                await asyncio.sleep(10)  # Cada 10 segundos
+                    self._status_gen += 1
                 
             except Exception as e:
                 self.logger.error(f"Error en monitoreo de rendimiento: {e}")
-                await asyncio.sleep(30)
+                interval = 30
+            
+            # Plazo absoluto para que el periodo no acumule deriva en ejecuciones largas
+            next_tick = max(next_tick + interval, loop.time())
+            await self._wait_for_shutdown(next_tick - loop.time())
     
     async def _config_check_loop(self) -> None:
         """Bucle de verificación de configuración"""
-        while self._running and not self._shutdown_event.is_set():
-            try:
-                # Verificar si la configuración ha cambiado
-                config_changed = self.config.reload_if_changed()
-                
-                if config_changed:
-                    self.logger.info("Configuración actualizada - aplicando cambios")
-                    await self._apply_config_changes()
-                
-                await asyncio.sleep(30)  # Cada 30 segundos
+        loop = asyncio.get_running_loop()
+        config_changed_event = asyncio.Event()
+        watching = self.config.watch_for_changes(
+            lambda: loop.call_soon_threadsafe(config_changed_event.set)
+        )
+        
+        try:
+            while not self._shutdown.is_set():
+                try:
+                    if watching:
+                        # Esperar notificación del kernel; el timeout es un respaldo por si se pierde
+                        if await self._wait_for_shutdown(300, config_changed_event):
+                            break
+                        config_changed_event.clear()
+                    
+                    # Verificar si la configuración ha cambiado
+                    config_changed = self.config.reload_if_changed()
+                    
+                    if config_changed:
+                        self.logger.info("Configuración actualizada - aplicando cambios")
+                        await self._apply_config_changes()
+                    
+                    if not watching:
+                        await self._wait_for_shutdown(30)  # Cada 30 segundos
                 
-            except Exception as e:
-                self.logger.error(f"Error verificando configuración: {e}")
-                await asyncio.sleep(60)
+                except Exception as e:
+                    self.logger.error(f"Error verificando configuración: {e}")
+                    await self._wait_for_shutdown(60)
+        finally:
+            self.config.stop_watching()
     
     async def _security_check_loop(self) -> None:
         """Bucle de verificación de seguridad"""
-        while self._running and not self._shutdown_event.is_set():
+        while not self._shutdown.is_set():
             try:
+                security_manager = self.components.security_manager
+                if security_manager and security_manager.edge_detection_enabled:
+                    # Esperar flanco del botón de emergencia, sin despertar periódicamente
+                    if await self._wait_for_shutdown(event=security_manager.emergency_event):
+                        break
+                    security_manager.emergency_event.clear()
+                
                 if self.components.security_manager:
                     # Verificar parada de emergencia
                     emergency_stop = self.components.security_manager.check_emergency_stop()
@@ -1352,19 +2471,24 @@ class EcoSortSystem:
                     if emergency_stop and not self.components.security_manager.emergency_stop_active:
                         self.logger.critical("PARADA DE EMERGENCIA ACTIVADA")
                         self.components.security_manager.emergency_stop_active = True
+                        self._update_flags(set_mask=FLAG_EMERGENCY)
+                        self._notify_state_changed()
                         await self._emergency_stop()
                     
                     elif not emergency_stop and self.components.security_manager.emergency_stop_active:
                         self.logger.info("Parada de emergencia desactivada")
                         self.components.security_manager.emergency_stop_active = False
+                        self._update_flags(clear_mask=FLAG_EMERGENCY)
+                        self._notify_state_changed()
                         # Requerir reinicio manual después de emergencia
                         self.state = SystemState.MAINTENANCE
                 
-                await asyncio.sleep(1)  # Cada segundo para verificaciones de seguridad
+                if not (security_manager and security_manager.edge_detection_enabled):
+                    await self._wait_for_shutdown(1)  # Sondeo cada segundo si no hay interrupción disponible
                 
             except Exception as e:
                 self.logger.error(f"Error en verificación de seguridad: {e}")
-                await asyncio.sleep(5)
+                await self._wait_for_shutdown(5)
     
     async def _apply_config_changes(self) -> None:
         """Aplica cambios de configuración dinámicamente"""
@@ -1376,6 +2500,10 @@ class EcoSortSystem:
             
             self.logger.info(f"Nivel de logging actualizado a {new_level}")
             
+            self._refresh_class_index()
+            self._refresh_cached_config()
+            self._status_gen += 1
+        
         except Exception as e:
             self.logger.error(f"Error aplicando cambios de configuración: {e}")
     
@@ -1395,7 +2523,8 @@ class EcoSortSystem:
             
             # Cambiar estado
             self.state = SystemState.ERROR
-            self._running = False
+            self._update_flags(clear_mask=FLAG_RUNNING)
+            self._notify_state_changed()  # Despertar al bucle si ya espera el cambio de modo
             
             self.logger.critical("Parada de emergencia completada")
             
@@ -1413,7 +2542,7 @@ class EcoSortSystem:
         try:
             self.logger.info("Iniciando sistema de clasificación...")
             self.state = SystemState.RUNNING
-            self._running = True
+            self._update_flags(set_mask=FLAG_RUNNING)
             
             # Verificar parada de emergencia antes de iniciar
             if (self.components.security_manager and 
@@ -1431,6 +2560,7 @@ class EcoSortSystem:
             self.state = SystemState.ERROR
             self.metrics.last_error = str(e)
             self.metrics.last_error_time = datetime.now()
+            self._status_gen += 1
             
             # Intentar recuperación automática
             if self.components.error_recovery:
@@ -1489,61 +2619,106 @@ class EcoSortSystem:
         """Bucle principal de operación con manejo avanzado de errores"""
         self.logger.info("Iniciando bucle principal...")
         
-        last_bin_check = time.time()
-        last_metrics_update = time.time()
-        bin_check_interval = self.config.get('system_settings', 'bin_check_interval_s', 30)
+        # Tiempo monotónico cacheado una vez por iteración (inmune a saltos del reloj de pared)
+        self._loop_now = time.monotonic()
+        last_metrics_update = self._loop_now
         metrics_interval = 5  # Actualizar métricas cada 5 segundos
         
+        # Ritmo adaptativo: tick de 10ms con actividad reciente, hasta idle_tick sin ella
+        active_tick = 0.01
+        idle_tick = self.config.get('system_settings', 'idle_loop_interval_s', 0.1)
+        last_object_time = float('-inf')
+        
+        self._trigger_interrupts = trigger_interrupts = self._enable_trigger_interrupt()
+        
         consecutive_errors = 0
         max_consecutive_errors = self.config.get('system_settings', 'max_processing_errors', 10)
         
+        # Limitar el log de errores repetidos (p. ej. sensor atascado) a uno por segundo
+        error_log_interval = 1.0
+        last_error_log = float('-inf')
+        suppressed_errors = 0
+        
+        # Referencias calientes enlazadas a locales (evita búsquedas de atributos por iteración)
+        monotonic = time.monotonic
+        alive = self._alive
+        wait_for_trigger = self._wait_for_object_trigger
+        
+        def next_due() -> float:
+            """Próximo vencimiento (monotónico) de tarea periódica"""
+            # Sin métricas pendientes, re-evaluar los flags al menos cada metrics_interval
+            return (last_metrics_update if self._metrics_dirty else self._loop_now) + metrics_interval
+        
         try:
-            while self._running and not self._shutdown_event.is_set():
-                loop_start_time = time.time()
+            while alive():
+                now = self._loop_now = monotonic()
                 
                 try:
-                    # Verificar parada de emergencia
-                    if (self.components.security_manager and 
-                        self.components.security_manager.emergency_stop_active):
-                        self.logger.warning("Operación pausada por parada de emergencia")
-                        await asyncio.sleep(1)
-                        continue
+                    flags = self._flags
                     
-                    # Verificar modo mantenimiento
-                    if self._maintenance_mode:
-                        await asyncio.sleep(1)
+                    # Parada de emergencia o mantenimiento: sin sondeo, esperar el cambio de modo
+                    if flags & (FLAG_EMERGENCY | FLAG_MAINTENANCE):
+                        if flags & FLAG_EMERGENCY:
+                            self.logger.warning("Operación pausada por parada de emergencia")
+                        self._state_changed.clear()
+                        # La parada de emergencia quita FLAG_RUNNING: salir hacia el shutdown
+                        if not alive():
+                            break
+                        if self._flags == flags:  # Sin cambio entre la lectura y el clear
+                            await self._wait_for_shutdown(event=self._state_changed)
                         continue
                     
+                    # Con interrupción, la espera del flanco sustituye al sleep de ritmo;
+                    # el timeout solo sirve para las tareas periódicas
+                    trigger_timeout = 0.0
+                    if trigger_interrupts:
+                        trigger_timeout = next_due() - now
+                    
                     # Verificar trigger de objeto
-                    if await self._wait_for_object_trigger():
+                    triggered = await wait_for_trigger(trigger_timeout)
+                    if trigger_timeout > 0:
+                        now = self._loop_now = monotonic()
+                    
+                    if triggered:
                         await self._process_detected_object()
                         consecutive_errors = 0  # Reset contador de errores
+                        last_object_time = now
                     
-                    # Procesar queue de objetos
-                    await self._process_object_queue()
-                    
-                    # Verificar niveles de tolva periódicamente
-                    if time.time() - last_bin_check > bin_check_interval:
-                        await self._check_bin_levels()
-                        last_bin_check = time.time()
-                    
-                    # Actualizar métricas periódicamente
-                    if time.time() - last_metrics_update > metrics_interval:
+                    # Actualizar métricas periódicamente, solo si hubo actividad
+                    if self._metrics_dirty and now - last_metrics_update > metrics_interval:
+                        self._metrics_dirty = False
                         self._update_metrics()
-                        last_metrics_update = time.time()
+                        last_metrics_update = now
                     
-                    # Control de velocidad del bucle
-                    loop_time = time.time() - loop_start_time
-                    if loop_time < 0.01:  # Mínimo 10ms entre iteraciones
-                        await asyncio.sleep(0.01 - loop_time)
+                    # Control de velocidad del bucle (en modo interrupción la espera ya ocurrió en el trigger)
+                    if trigger_interrupts:
+                        continue
+                    loop_end = monotonic()
+                    if now - last_object_time < 1.0:
+                        sleep_s = active_tick - (loop_end - now)
+                        if sleep_s > 0:
+                            await asyncio.sleep(sleep_s)
+                    else:
+                        # Dormir hasta la próxima tarea periódica, con tope idle_tick
+                        sleep_s = next_due() - loop_end
+                        if sleep_s > idle_tick:
+                            sleep_s = idle_tick
+                        if sleep_s > 0:
+                            await self._wait_for_shutdown(sleep_s)
                 
                 except Exception as e:
                     consecutive_errors += 1
-                    self.logger.error(f"Error en bucle principal (#{consecutive_errors}): {e}")
+                    if now - last_error_log >= error_log_interval:
+                        self.logger.error("Error en bucle principal (#%d, %d suprimidos): %s",
+                                          consecutive_errors, suppressed_errors, e)
+                        last_error_log = now
+                        suppressed_errors = 0
+                    else:
+                        suppressed_errors += 1
                     
                     # Si hay muchos errores consecutivos, intentar recuperación
                     if consecutive_errors >= max_consecutive_errors:
-                        self.logger.error(f"Demasiados errores consecutivos ({consecutive_errors})")
+                        self.logger.error("Demasiados errores consecutivos (%d)", consecutive_errors)
                         
                         if self.components.error_recovery:
                             recovery_success = await self.components.error_recovery.handle_error(
@@ -1563,33 +2738,62 @@ class EcoSortSystem:
                     await asyncio.sleep(min(consecutive_errors * 0.1, 2.0))
         
         except Exception as e:
-            self.logger.error(f"Error crítico en bucle principal: {e}")
+            self.logger.error("Error crítico en bucle principal: %s", e)
             raise
         
         finally:
             self.logger.info("Bucle principal terminado")
     
-    async def _wait_for_object_trigger(self) -> bool:
-        """Espera trigger de objeto con timeout"""
+    def _enable_trigger_interrupt(self) -> bool:
+        """Registra la interrupción del sensor de disparo (llamar desde el event loop)"""
+        loop = asyncio.get_running_loop()
+        
+        def _trigger_isr(channel):
+            # Ejecutado en el hilo de eventos de RPi.GPIO
+            loop.call_soon_threadsafe(self._trigger_event.set)
+        
         try:
             from Control_Banda.RPi_control_bajo_nivel import sensor_interface as band_sensors
-            
+            # Enlazar la función de sondeo una vez, no importar en cada iteración
+            self._check_camera_trigger = band_sensors.check_camera_trigger
+            enabled = bool(band_sensors.register_camera_trigger_callback(_trigger_isr))
+        except Exception as e:
+            self.logger.warning(f"No se pudo registrar interrupción de disparo: {e}")
+            enabled = False
+        
+        if not enabled:
+            self.logger.info("Disparo de cámara por sondeo")
+        return enabled
+    
+    async def _wait_for_object_trigger(self, timeout: float = 0.0) -> bool:
+        """Espera trigger de objeto con timeout"""
+        if self._trigger_interrupts:
+            if not self._trigger_event.is_set() and timeout > 0:
+                await self._wait_for_shutdown(timeout, event=self._trigger_event)
+            if self._trigger_event.is_set():
+                self._trigger_event.clear()
+                return True
+            return False
+        
+        check_camera_trigger = self._check_camera_trigger
+        if check_camera_trigger is None:
+            return False
+        
+        try:
             # Verificar trigger sin bloqueo
-            return band_sensors.check_camera_trigger()
+            return check_camera_trigger()
             
         except Exception as e:
-            self.logger.error(f"Error verificando trigger: {e}")
+            self.logger.error("Error verificando trigger: %s", e)
             return False
     
     async def _process_detected_object(self) -> None:
-        """Procesa un objeto detectado con manejo completo de errores"""
-        process_start_time = time.time()
-        object_id = None
+        """Etapa de captura: adquiere la imagen y la pasa a la etapa de inferencia"""
+        process_start_time = self._loop_now
         
         try:
-            capture_time = time.time()
-            
-            # Capturar imagen
+            # Capturar imagen en un buffer libre (el anterior puede seguir en inferencia)
+            self._capture_buf = self._frame_pool.pop() if self._frame_pool else None
             image = await self._capture_image()
             if image is None:
                 self.metrics.failed_classifications += 1
@@ -1598,72 +2802,118 @@ class EcoSortSystem:
             self.last_object_id += 1
             object_id = self.last_object_id
             
+            if self._inference_task is None or self._inference_task.done():
+                await self._classify_and_record(object_id, image, process_start_time)
+            else:
+                # Contrapresión: con la etapa de inferencia ocupada, la captura espera aquí
+                await self._inference_queue.put((object_id, image, process_start_time))
+        
+        except Exception as e:
+            self.logger.error("Error capturando objeto detectado: %s", e)
+            self.metrics.failed_classifications += 1
+            
+            # Intentar recuperación si es un error recurrente
+            if "camera" in str(e).lower() or "captur" in str(e).lower():
+                if self.components.error_recovery:
+                    await self.components.error_recovery.handle_error(
+                        HardwareError(str(e), ErrorSeverity.MEDIUM, 'camera'), self
+                    )
+    
+    async def _inference_stage(self) -> None:
+        """Etapa de inferencia: clasifica mientras la etapa de captura atiende el siguiente trigger"""
+        queue = self._inference_queue
+        loop = asyncio.get_running_loop()
+        while True:
+            # Sin esperar a llenar el lote: solo se agrupa lo que ya está en cola
+            batch = [await queue.get()]
+            while len(batch) < self._max_inference_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            try:
+                batch_detections = [None] * len(batch)
+                detector = self.components.ai_detector
+                if len(batch) > 1 and hasattr(detector, 'detect_objects_batch'):
+                    try:
+                        batch_detections = await loop.run_in_executor(
+                            self._inference_pool, detector.detect_objects_batch,
+                            [image for _, image, _ in batch]
+                        )
+                    except Exception as e:
+                        self.logger.warning("Inferencia por lotes fallida, se clasifica frame a frame: %s", e)
+                
+                for (object_id, image, process_start_time), detections in zip(batch, batch_detections):
+                    await self._classify_and_record(object_id, image, process_start_time, detections)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def _classify_and_record(self, object_id: int, image: np.ndarray, process_start_time: float,
+                                   detections: Optional[list] = None) -> None:
+        """Clasifica un objeto capturado, lo registra y lo encola para desviación"""
+        image_handed_off = False
+        try:
+            capture_time = process_start_time
+            
             # Clasificar objeto
-            result = await self._classify_object(object_id, image, process_start_time)
+            result = await self._classify_object(object_id, image, process_start_time, detections)
             
-            # Registrar en base de datos
+            # Registrar en base de datos (en lote, el id llega después)
             if self.components.database and not result.is_error:
-                try:
-                    result.classification_db_id = self.components.database.record_classification(
-                        category=result.category_name,
-                        confidence=result.confidence,
-                        processing_time_ms=result.processing_time_ms,
-                        diverter_activated=False,  # Se actualizará después
-                        error_occurred=result.is_error,
-                        error_message=result.error_message
-                    )
-                except Exception as e:
-                    self.logger.warning(f"Error registrando en BD: {e}")
+                self._queue_classification_record(object_id, result)
             
             # Añadir a queue para procesamiento de desviación
             if not result.is_error and result.category_index >= 0:
                 try:
-                    self.object_queue.append((
+                    # Contrapresión: si la queue está llena, agendar pendientes antes de sobrescribir
+                    if self.object_queue.full():
+                        await self._process_object_queue()
+                    if self.object_queue.full():
+                        self.logger.warning("Queue de objetos llena, se descarta el objeto más antiguo")
+                    self.object_queue.push(
                         object_id,
                         result.classification_db_id,
                         result.category_index,
                         capture_time,
                         result.confidence
-                    ))
+                    )
+                    if self._object_queue_task is None or self._object_queue_task.done():
+                        await self._process_object_queue()  # Sin consumidor: agendar en línea
+                    else:
+                        self._object_ready.set()
                 except Exception as e:
-                    self.logger.error(f"Error añadiendo a queue: {e}")
+                    self.logger.error("Error añadiendo a queue: %s", e)
             
-            # Guardar imagen si está configurado
-            await self._save_image_if_configured(image, object_id, result)
+            # Guardar imagen si está configurado (en segundo plano; el escritor devuelve el buffer al pool)
+            image_handed_off = self._save_image_if_configured(image, object_id, result)
             
             # Actualizar métricas
             self.metrics.objects_processed += 1
             if result.is_error:
                 self.metrics.failed_classifications += 1
-                self.metrics.error_count_by_severity[result.error_message or 'unknown'] = \
-                    self.metrics.error_count_by_severity.get(result.error_message or 'unknown', 0) + 1
+                self.metrics.error_count_by_severity[result.severity] += 1
             else:
                 self.metrics.successful_classifications += 1
             
-            # Actualizar tiempo promedio de procesamiento
-            total_time = (time.time() - process_start_time) * 1000
-            if self.metrics.objects_processed > 0:
-                self.metrics.average_processing_time_ms = (
-                    (self.metrics.average_processing_time_ms * (self.metrics.objects_processed - 1) + total_time) 
-                    / self.metrics.objects_processed
-                )
+            self._metrics_dirty = True
             
-            self.logger.info(f"Objeto {object_id} procesado: {result.category_name} "
-                           f"({result.confidence:.2f}) en {total_time:.1f}ms")
+            # Registrar tiempo de procesamiento (el promedio se calcula fuera del camino crítico)
+            total_time = (time.monotonic() - process_start_time) * 1000
+            self._recent_times.append(total_time)
+            
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Objeto %d procesado: %s (%.2f) en %.1fms",
+                                 object_id, result.category_name, result.confidence, total_time)
             
         except Exception as e:
-            self.logger.error(f"Error procesando objeto detectado (ID: {object_id}): {e}")
+            self.logger.error("Error procesando objeto detectado (ID: %d): %s", object_id, e)
             self.metrics.failed_classifications += 1
-            
-            # Intentar recuperación si es un error recurrente
-            if "camera" in str(e).lower() or "captur" in str(e).lower():
-                if self.components.error_recovery:
-                    await self.components.error_recovery.handle_error(
-                        HardwareError(str(e), ErrorSeverity.MEDIUM, 'camera'), self
-                    )
+        finally:
+            # El buffer del frame vuelve al pool para una próxima captura
+            if not image_handed_off:
+                self._frame_pool.append(image)
     
     async def _capture_image(self) -> Optional[np.ndarray]:
-        """Captura una imagen con reintentos y validación"""
+        """Captura una imagen con reintentos y validación (buffer reutilizado, válido hasta la siguiente captura)"""
         max_retries = 3
         
         for attempt in range(max_retries):
@@ -1671,7 +2921,30 @@ class EcoSortSystem:
                 if not self.components.camera or not self.components.camera.isOpened():
                     raise HardwareError("Cámara no disponible", ErrorSeverity.HIGH, 'camera')
                 
-                ret, frame = self.components.camera.read()
+                grabber = self.components.frame_grabber
+                if grabber is not None and grabber.is_alive():
+                    if grabber.decode_on_demand:
+                        # Solo se decodifica el frame que sigue al trigger
+                        loop = asyncio.get_running_loop()
+                        ret, frame = await loop.run_in_executor(
+                            self._hw_pool, grabber.request_frame, self._capture_buf
+                        )
+                    else:
+                        # Doble buffer: el frame más reciente se entrega sin copiar y el buffer libre
+                        # del pool pasa al hilo de captura como siguiente destino
+                        frame = grabber.take(self._capture_buf)
+                        if frame is None:
+                            # Ya entregado: esperar al siguiente frame del hilo de captura
+                            loop = asyncio.get_running_loop()
+                            await loop.run_in_executor(self._hw_pool, grabber.wait_next, 0.1)
+                            frame = grabber.take(self._capture_buf)
+                        ret = frame is not None
+                else:
+                    # Drenar y decodificar fuera del event loop (grab() bloquea hasta el siguiente frame)
+                    loop = asyncio.get_running_loop()
+                    ret, frame = await loop.run_in_executor(
+                        self._hw_pool, self._grab_latest_frame, self.components.camera
+                    )
                 if not ret or frame is None:
                     if attempt < max_retries - 1:
                         await asyncio.sleep(0.1)
@@ -1682,49 +2955,76 @@ class EcoSortSystem:
                 if frame.size == 0:
                     raise HardwareError("Frame vacío", ErrorSeverity.MEDIUM, 'camera')
                 
+                self._capture_buf = frame
                 return frame
                 
             except Exception as e:
                 if attempt == max_retries - 1:
-                    self.logger.error(f"Error capturando imagen después de {max_retries} intentos: {e}")
+                    self.logger.error("Error capturando imagen después de %d intentos: %s", max_retries, e)
                     return None
                 await asyncio.sleep(0.1)
         
         return None
     
+    def _grab_latest_frame(self, camera, drain_budget_s: float = 0.005) -> Tuple[bool, Optional[np.ndarray]]:
+        """Descarta frames en buffer con grab() (sin decodificar) y decodifica solo el último"""
+        deadline = time.monotonic() + drain_budget_s
+        # Los frames ya en buffer vuelven al instante; el primero que tarda es uno nuevo
+        while camera.grab() and time.monotonic() < deadline:
+            pass
+        # OpenCV decodifica en el buffer existente si la resolución no cambió
+        return camera.retrieve(self._capture_buf)
+    
     def enter_maintenance_mode(self) -> None:
         """Entra en modo mantenimiento"""
-        self._maintenance_mode = True
+        self._update_flags(set_mask=FLAG_MAINTENANCE)
         self.state = SystemState.MAINTENANCE
         self.metrics.last_maintenance = datetime.now()
+        self._status_gen += 1
+        self._notify_state_changed()
         self.logger.info("Sistema en modo mantenimiento")
     
     def exit_maintenance_mode(self) -> None:
         """Sale del modo mantenimiento"""
-        self._maintenance_mode = False
-        if self._running:
+        self._update_flags(clear_mask=FLAG_MAINTENANCE)
+        if self._flags & FLAG_RUNNING:
             self.state = SystemState.RUNNING
         else:
             self.state = SystemState.IDLE
+        self._notify_state_changed()
         self.logger.info("Sistema salió del modo mantenimiento")
     
     def pause(self) -> None:
         """Pausa el sistema de manera segura"""
         if self.state == SystemState.RUNNING:
             self.state = SystemState.PAUSED
+            self._notify_state_changed()
             self.logger.info("Sistema pausado")
     
     def resume(self) -> None:
         """Reanuda el sistema"""
         if self.state == SystemState.PAUSED:
             self.state = SystemState.RUNNING
+            self._notify_state_changed()
             self.logger.info("Sistema reanudado")
     
+    def _notify_state_changed(self) -> None:
+        """Despierta a quien espera un cambio de modo o de emergencia (llamar desde el hilo del event loop)"""
+        try:
+            asyncio.get_running_loop().call_soon_threadsafe(self._state_changed.set)
+        except RuntimeError:
+            # Sin loop en este hilo: solo es correcto si ningún loop está esperando el evento
+            self._state_changed.set()
+    
     def request_shutdown(self) -> None:
         """Solicita shutdown del sistema"""
         self.logger.info("Shutdown solicitado...")
-        self._running = False
-        self._shutdown_event.set()
+        self._update_flags(set_mask=FLAG_SHUTDOWN, clear_mask=FLAG_RUNNING)
+        try:
+            # Puede invocarse desde el manejador de señales; despertar al loop de forma segura
+            asyncio.get_running_loop().call_soon_threadsafe(self._shutdown.set)
+        except RuntimeError:
+            self._shutdown.set()
     
     async def shutdown(self) -> None:
         """Shutdown completo del sistema con limpieza avanzada"""
@@ -1743,6 +3043,18 @@ class EcoSortSystem:
                 tasks_to_cancel.append(self._config_check_task)
             if hasattr(self, '_security_task'):
                 tasks_to_cancel.append(self._security_task)
+            if self._db_writer_task:
+                tasks_to_cancel.append(self._db_writer_task)
+            if self._metrics_report_task:
+                tasks_to_cancel.append(self._metrics_report_task)
+            if self._bin_monitor_task:
+                tasks_to_cancel.append(self._bin_monitor_task)
+            if self._diversion_scheduler_task:
+                tasks_to_cancel.append(self._diversion_scheduler_task)
+            if self._inference_task:
+                tasks_to_cancel.append(self._inference_task)
+            if self._object_queue_task:
+                tasks_to_cancel.append(self._object_queue_task)
             
             for task in tasks_to_cancel:
                 if not task.done():
@@ -1762,27 +3074,40 @@ class EcoSortSystem:
             except Exception as e:
                 self.logger.error(f"Error deteniendo banda: {e}")
             
+            # Descartar desviaciones agendadas que aún no vencieron
+            for _, object_id in self._diversion_heap:
+                self.active_diversions.remove(object_id)
+            self._diversion_heap.clear()
+            
             # Esperar a que terminen las diversiones activas
             if self.active_diversions:
                 self.logger.info(f"Esperando {len(self.active_diversions)} diversiones activas...")
                 max_wait_time = 10  # segundos
-                wait_start = time.time()
-                
-                while self.active_diversions and (time.time() - wait_start) < max_wait_time:
-                    await asyncio.sleep(0.1)
                 
-                # Forzar limpieza si algunas no terminaron
-                if self.active_diversions:
+                try:
+                    await asyncio.wait_for(self._div_queue.join(), timeout=max_wait_time)
+                except asyncio.TimeoutError:
+                    # Forzar limpieza si algunas no terminaron
                     self.logger.warning(f"Forzando limpieza de {len(self.active_diversions)} diversiones pendientes")
-                    self.active_diversions.clear()
+                self.active_diversions.clear()
+            
+            for worker in self._diversion_workers:
+                worker.cancel()
+            await asyncio.gather(*self._diversion_workers, return_exceptions=True)
+            self._diversion_workers = []
+            
+            # Escribir las últimas actualizaciones de desviación y eventos
+            await self._diversion_writer.stop()
+            await self._event_log.stop()
             
             # Limpiar componentes
             await self._cleanup_components()
+            self._thermal_fd = _close_thermal_fd(self._thermal_fd)
             
             # Registrar evento final
             if self.components.database:
                 try:
-                    self.components.database.log_system_event(
+                    self.components.log_event(
                         'shutdown', 'info', 
                         f'Sistema detenido correctamente. Objetos procesados: {self.metrics.objects_processed}'
                     )
@@ -1801,10 +3126,31 @@ class EcoSortSystem:
         self.logger.info("Limpiando componentes del sistema...")
         
         # Limpiar cámara
-        if self.components.camera and self.components.camera.isOpened():
-            self.components.camera.release()
+        if self.components.camera:
+            self.components.release_camera()
             self.logger.info("Cámara liberada")
         
+        if self.components.performance_monitor:
+            self.components.performance_monitor.close()
+        
+        # Completar las escrituras de imágenes pendientes y liberar hilos de hardware;
+        # lecturas e inferencias encoladas ya no tienen consumidor: se descartan
+        self._image_writer_pool.shutdown(wait=True)
+        self._hw_pool.shutdown_discarding_pending()
+        self._inference_pool.shutdown_discarding_pending()
+        self._db_pool.shutdown(wait=True)
+        
+        # Volcar el buffer de escritura de la BD antes de salir
+        if hasattr(self.components.database, 'flush'):
+            try:
+                self.components.database.flush()
+            except Exception as e:
+                self.logger.error(f"Error volcando escrituras pendientes de BD: {e}")
+        
+        # Sin inferencias en vuelo: cerrar el loop interno del detector
+        if hasattr(self.components.ai_detector, 'close'):
+            self.components.ai_detector.close()
+        
         # Limpiar hardware
         try:
             from Control_Banda.RPi_control_bajo_nivel import sensor_interface as band_sensors
@@ -1823,30 +3169,49 @@ class EcoSortSystem:
     
     def get_status(self) -> Dict[str, Any]:
         """Obtiene el estado completo del sistema"""
-        return {
+        # Contadores siempre en vivo; solo los resúmenes costosos vienen de la caché (copiados)
+        status = copy.deepcopy(self._get_cached_status())
+        status.update({
+            'metrics': self._get_metrics_status(),
             'state': self.state.value,
-            'uptime_seconds': time.time() - self.start_time,
-            'metrics': {
-                'objects_processed': self.metrics.objects_processed,
-                'successful_classifications': self.metrics.successful_classifications,
-                'failed_classifications': self.metrics.failed_classifications,
-                'diversions_attempted': self.metrics.diversions_attempted,
-                'diversions_successful': self.metrics.diversions_successful,
-                'average_processing_time_ms': self.metrics.average_processing_time_ms,
-                'cpu_usage_percent': self.metrics.cpu_usage_percent,
-                'memory_usage_percent': self.metrics.memory_usage_percent,
-                'temperature_celsius': self.metrics.temperature_celsius,
-                'error_count_by_severity': self.metrics.error_count_by_severity,
-                'recovery_attempts': self.metrics.recovery_attempts,
-                'successful_recoveries': self.metrics.successful_recoveries,
-                'last_error': self.metrics.last_error,
-                'last_maintenance': self.metrics.last_maintenance.isoformat() if self.metrics.last_maintenance else None
-            },
+            'uptime_seconds': self._uptime_ns() / 1e9,
             'active_diversions': len(self.active_diversions),
             'queue_size': len(self.object_queue),
             'components_initialized': self.components.is_initialized(),
             'component_status': self.components.get_component_status(),
-            'maintenance_mode': self._maintenance_mode,
+            'maintenance_mode': bool(self._flags & FLAG_MAINTENANCE),
+        })
+        return status
+    
+    def _get_metrics_status(self) -> Dict[str, Any]:
+        """Contadores y métricas actuales del sistema"""
+        metrics = self.metrics
+        return {
+            'objects_processed': metrics.objects_processed,
+            'successful_classifications': metrics.successful_classifications,
+            'failed_classifications': metrics.failed_classifications,
+            'diversions_attempted': metrics.diversions_attempted,
+            'diversions_successful': metrics.diversions_successful,
+            'objects_dropped': metrics.objects_dropped,
+            'average_processing_time_ms': metrics.average_processing_time_ms,
+            'cpu_usage_percent': metrics.cpu_usage_percent,
+            'memory_usage_percent': metrics.memory_usage_percent,
+            'temperature_celsius': metrics.temperature_celsius,
+            'error_count_by_severity': {
+                severity.value: count for severity, count in metrics.error_count_by_severity.items()
+            },
+            'recovery_attempts': metrics.recovery_attempts,
+            'successful_recoveries': metrics.successful_recoveries,
+            'last_error': metrics.last_error,
+            'last_maintenance': metrics.last_maintenance.isoformat() if metrics.last_maintenance else None
+        }
+    
+    def _get_cached_status(self) -> Dict[str, Any]:
+        """Resúmenes costosos del estado, recalculados solo con las actualizaciones periódicas"""
+        if self._status_cache_gen == self._status_gen and self._status_cache is not None:
+            return self._status_cache
+        
+        self._status_cache = {
             'config_version': self.config.get('version', 'unknown'),
             'performance_summary': (
                 self.components.performance_monitor.get_performance_summary() 
@@ -1857,6 +3222,8 @@ class EcoSortSystem:
                 if self.components.error_recovery else []
             )
         }
+        self._status_cache_gen = self._status_gen
+        return self._status_cache
     
     def get_detailed_diagnostics(self) -> Dict[str, Any]:
         """Obtiene diagnósticos detallados del sistema"""
@@ -1896,23 +3263,36 @@ class EcoSortSystem:
             diagnostics['performance_history'] = list(self.components.performance_monitor.metrics_history)[-20:]
         
         return diagnostics
+    
+    def snapshot_all(self) -> Dict[str, Any]:
+        """Estado, diagnósticos y configuración en una sola instantánea (para reportes)"""
+        # Una sola comprobación de recarga; las lecturas siguientes usan la configuración ya cargada
+        self.config.reload_if_changed()
+        return {
+            'system_status': self.get_status(),
+            'diagnostics': self.get_detailed_diagnostics(),
+            'configuration': dict(self.config._config)
+        }
 
-    async def _classify_object(self, object_id: int, image, process_start: float) -> ClassificationResult:
-        """Clasifica un objeto usando IA con manejo avanzado de errores"""
+    async def _classify_object(self, object_id: int, image, process_start: float,
+                               detections: Optional[list] = None) -> ClassificationResult:
+        """Clasifica un objeto usando IA (o las detecciones ya calculadas en lote)"""
         try:
             if not self.components.ai_detector:
                 raise AIError("Detector de IA no disponible", ErrorSeverity.HIGH, 'ai_model')
             
             # Realizar detección
-            detections = self.components.ai_detector.detect_objects(image)
-            processing_time_ms = (time.time() - process_start) * 1000
+            if detections is None:
+                loop = asyncio.get_running_loop()
+                detections = await loop.run_in_executor(
+                    self._inference_pool, self.components.ai_detector.detect_objects, image
+                )
+            processing_time_ms = (time.monotonic() - process_start) * 1000
             
-            system_class_names = self.config.get('ai_model_settings', 'class_names')
-
             if not detections:
                 # No se detectó nada
-                category_name = self._get_fallback_category(system_class_names)
-                category_index = self._get_category_index(category_name, system_class_names)
+                category_name = self._fallback_category
+                category_index = self._fallback_index
                 
                 return ClassificationResult(
                     object_id=object_id,
@@ -1929,12 +3309,12 @@ class EcoSortSystem:
             detected_class, confidence, _ = best_detection
             
             # Mapear a clases del sistema
-            if detected_class in system_class_names:
+            category_index = self._class_name_to_index.get(detected_class)
+            if category_index is not None:
                 category_name = detected_class
-                category_index = system_class_names.index(detected_class)
             else:
-                category_name = self._get_fallback_category(system_class_names)
-                category_index = self._get_category_index(category_name, system_class_names)
+                category_name = self._fallback_category
+                category_index = self._fallback_index
             
             return ClassificationResult(
                 object_id=object_id,
@@ -1950,20 +3330,17 @@ class EcoSortSystem:
             self.logger.error(f"Error clasificando objeto {object_id}: {e}")
             
             # Retornar resultado de error
-            error_category = "ErrorIA"
-            system_class_names = self.config.get('ai_model_settings', 'class_names')
-            error_index = self._get_category_index(error_category, system_class_names, default=-2)
-            
             return ClassificationResult(
                 object_id=object_id,
                 classification_db_id=None,
-                category_name=error_category,
-                category_index=error_index,
+                category_name=AI_ERROR_CATEGORY,
+                category_index=self._error_index,
                 confidence=0.0,
-                processing_time_ms=(time.time() - process_start) * 1000,
+                processing_time_ms=(time.monotonic() - process_start) * 1000,
                 detection_time=time.time(),
                 error_message=str(e),
-                is_error=True
+                is_error=True,
+                severity=e.severity if isinstance(e, SystemError) else ErrorSeverity.MEDIUM
             )
     
     def _get_fallback_category(self, system_class_names: List[str]) -> str:
@@ -1975,280 +3352,651 @@ class EcoSortSystem:
         else:
             return 'other'  # Fallback por defecto
     
-    def _get_category_index(self, category_name: str, system_class_names: List[str], default: int = -1) -> int:
+    def _get_category_index(self, category_name: str, default: int = -1) -> int:
         """Obtiene el índice de una categoría"""
-        try:
-            return system_class_names.index(category_name)
-        except ValueError:
-            return default
+        return self._class_name_to_index.get(category_name, default)
+    
+    def _refresh_cached_config(self) -> None:
+        """Precalcula valores de configuración leídos en los caminos calientes"""
+        raw_duration = self.config.get('conveyor_belt_settings', 'diverter_activation_duration_s', 0.75)
+        duration = min(max(float(raw_duration), DIVERTER_DURATION_MIN_S), DIVERTER_DURATION_MAX_S)
+        if duration != raw_duration:
+            self.logger.warning("Duración de activación inválida: %ss, ajustada a %ss", raw_duration, duration)
+        
+        bin_common = (self.config.get('sensors_settings', 'bin_level_sensors') or {}).get('settings_common', {})
+        
+        # Retardo cámara→desviador por categoría; 'other' nunca se desvía
+        belt_speed = self.config.get('conveyor_belt_settings', 'belt_speed_mps', 0.1)
+        distances = self.config.get('conveyor_belt_settings', 'distance_camera_to_diverters_m', {}) or {}
+        diversion_delays = {
+            name: (distance / belt_speed if belt_speed > 0 else 0.0)
+            for name, distance in distances.items()
+            if name.lower() != 'other'
+        }
+        
+        coalesce_ms = self.config.get('system_settings', 'diversion_coalesce_ms', 2.0)
+        
+        self._cached_cfg = RuntimeConfig(
+            belt_speed=belt_speed,
+            diversion_delays=MappingProxyType(diversion_delays),
+            diversion_coalesce_s=max(0.0, float(coalesce_ms)) / 1000.0,
+            diverter_duration=duration,
+            bin_full_threshold=bin_common.get('full_threshold_percent', 80.0),
+            bin_critical_threshold=bin_common.get('critical_threshold_percent', 95.0),
+            bin_level_epsilon=bin_common.get('report_epsilon_percent', 1.0),
+            save_images=bool(self.config.get('system_settings', 'save_images', False)),
+            image_quality=int(self.config.get('system_settings', 'image_quality', 85)),
+            disk_check_interval_s=self.config.get('system_settings', 'disk_check_interval_s', 30)
+        )
+    
+    def _refresh_class_index(self) -> None:
+        """Reconstruye el mapeo de clases del sistema desde la configuración"""
+        names = self.config.get('ai_model_settings', 'class_names') or []
+        self._class_names = list(names)
+        self._class_name_to_index = {name: i for i, name in enumerate(names)}
+        self._fallback_category = self._get_fallback_category(self._class_names)
+        self._fallback_index = self._get_category_index(self._fallback_category)
+        self._error_index = self._get_category_index(AI_ERROR_CATEGORY, default=-2)
     
-    async def _save_image_if_configured(self, image, object_id: int, result: ClassificationResult) -> None:
-        """Guarda imagen si está configurado con mejoras de seguridad"""
+    def _save_image_if_configured(self, image, object_id: int, result: ClassificationResult) -> bool:
+        """Encola el guardado de la imagen sin esperar al disco; True si el escritor se quedó el buffer"""
         try:
-            if not self.config.get('system_settings', 'save_images', False):
-                return
+            cfg = self._cached_cfg
+            if not cfg.save_images:
+                return False
             
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             images_dir = 'captures'
-            os.makedirs(images_dir, exist_ok=True)
+            loop = asyncio.get_running_loop()
+            
+            # Verificar espacio disponible (cacheado, en el hilo de escritura, antes de las escrituras siguientes)
+            if self._loop_now - self._last_disk_check >= cfg.disk_check_interval_s:
+                self._last_disk_check = self._loop_now
+                check = loop.run_in_executor(self._image_writer_pool, self._prepare_capture_dir, images_dir)
+                check.add_done_callback(self._on_disk_checked)
             
-            # Verificar espacio disponible
-            disk_usage = psutil.disk_usage(images_dir)
-            free_gb = disk_usage.free / (1024**3)
-            if free_gb < 0.5:  # Menos de 500MB
+            if not self._disk_space_ok:
                 self.logger.warning("Poco espacio en disco, omitiendo captura de imagen")
-                return
+                return False
             
-            filename = f"obj_{object_id}_{result.category_name}_{timestamp}.jpg"
-            image_path = os.path.join(images_dir, filename)
+            # Escritor saturado: descartar la captura antes que frenar la banda
+            if self._pending_image_writes >= self._max_pending_image_writes:
+                self.metrics.images_dropped += 1
+                if self.metrics.images_dropped % 50 == 1:
+                    self.logger.warning("Escritor de imágenes saturado, %d capturas omitidas",
+                                        self.metrics.images_dropped)
+                return False
             
-            # Guardar con calidad configurada
-            image_quality = self.config.get('system_settings', 'image_quality', 85)
-            cv2.imwrite(image_path, image, [cv2.IMWRITE_JPEG_QUALITY, image_quality])
+            filename = (f"obj_{object_id}_{result.category_name}_"
+                        f"{self._session_ts}_{next(self._capture_seq):06d}.jpg")
+            image_path = os.path.join(images_dir, filename)
             
-            self.logger.debug(f"Imagen guardada: {image_path}")
+            # Guardar con calidad configurada; el buffer no vuelve al pool hasta terminar la escritura
+            write = loop.run_in_executor(
+                self._image_writer_pool, self._write_jpeg, image_path, image, cfg.image_quality
+            )
+            self._pending_image_writes += 1
+            write.add_done_callback(lambda future: self._on_image_written(future, image, image_path))
+            return True
             
         except Exception as e:
             self.logger.error(f"Error guardando imagen: {e}")
+            return False
+    
+    def _on_disk_checked(self, future: asyncio.Future) -> None:
+        """Actualiza el estado de espacio en disco con el resultado de la verificación"""
+        try:
+            self._disk_space_ok = future.result() >= 0.5 * 1024**3  # Al menos 500MB
+        except Exception as e:
+            self.logger.error(f"Error verificando espacio para capturas: {e}")
+    
+    def _on_image_written(self, future: asyncio.Future, image: np.ndarray, image_path: str) -> None:
+        """Fin de una escritura de imagen: devuelve el buffer al pool de frames"""
+        self._pending_image_writes -= 1
+        self._frame_pool.append(image)
+        try:
+            future.result()
+            self.logger.debug("Imagen guardada: %s", image_path)
+        except Exception as e:
+            self.logger.error(f"Error guardando imagen: {e}")
+    
+    def _write_jpeg(self, image_path: str, image: np.ndarray, quality: int) -> None:
+        """Codifica y escribe una captura JPEG (bloqueante, en el hilo de escritura)"""
+        if self._jpeg is not None:
+            data = self._jpeg.encode(image, quality=quality)
+        else:
+            params = self._jpeg_params
+            if not params or params[1] != quality:
+                params = self._jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, quality,
+                                              cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+            ok, encoded = cv2.imencode('.jpg', image, params)
+            if not ok:
+                raise ValueError(f"No se pudo codificar la imagen {image_path}")
+            data = encoded  # El buffer de numpy se escribe sin copia
+        
+        # Sin buffer de Python: write directo del JPEG ya codificado (FileIO puede escribir parcial)
+        view = memoryview(data).cast('B')
+        with open(image_path, 'wb', buffering=0) as f:
+            while view:
+                view = view[f.write(view):]
+    
+    @staticmethod
+    def _prepare_capture_dir(images_dir: str) -> int:
+        """Crea el directorio de capturas y devuelve los bytes libres (bloqueante)"""
+        os.makedirs(images_dir, exist_ok=True)
+        stats = os.statvfs(images_dir)
+        return stats.f_bavail * stats.f_frsize
+    
+    async def _object_queue_consumer(self) -> None:
+        """Agenda las desviaciones de los objetos clasificados en cuanto llegan a la queue"""
+        ready = self._object_ready
+        while True:
+            if await self._wait_for_shutdown(None, ready):
+                return
+            ready.clear()
+            while self.object_queue:
+                self._loop_now = time.monotonic()
+                await self._process_object_queue()
+                await asyncio.sleep(0)  # Ceder entre lotes ante ráfagas
     
     async def _process_object_queue(self) -> None:
         """Procesa la queue de objetos para desviación con límites de procesamiento"""
         max_objects_per_iteration = 5  # Limitar procesamiento por iteración
-        processed_count = 0
+        if not self.object_queue:
+            return
+        
+        # Configuración leída una vez por lote, no por objeto
+        class_names = self._class_names
+        not_diverted: List[int] = []
         
-        while self.object_queue and processed_count < max_objects_per_iteration:
+        for _ in range(min(len(self.object_queue), max_objects_per_iteration)):
             try:
-                object_data = self.object_queue.popleft()
-                await self._schedule_diversion(*object_data)
-                processed_count += 1
+                object_data = self.object_queue.pop()
+                await self._schedule_diversion(*object_data, class_names=class_names,
+                                               not_diverted=not_diverted)
                 
             except Exception as e:
                 self.logger.error(f"Error procesando queue de objetos: {e}")
                 break
+        
+        if not_diverted:
+            self._mark_not_diverted(not_diverted)
+    
+    def _mark_not_diverted(self, classification_ids: List[int]) -> None:
+        """Marca en BD, vía el escritor por lotes, las clasificaciones sin desviación"""
+        if not self.components.database:
+            return
+        for classification_id in classification_ids:
+            self._diversion_writer.submit({'classification_id': classification_id, 'diverter_activated': False})
+    
+    def _queue_classification_record(self, object_id: int, result: ClassificationResult) -> None:
+        """Encola el registro de una clasificación para el escritor por lotes"""
+        record = {
+            'category': result.category_name,
+            'confidence': result.confidence,
+            'processing_time_ms': result.processing_time_ms,
+            'diverter_activated': False,  # Se actualizará después
+            'error_occurred': result.is_error,
+            'error_message': result.error_message
+        }
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._db_queue.put_nowait((record, future))
+        except asyncio.QueueFull:
+            self.logger.warning("Queue de BD llena, clasificación del objeto %d no registrada", object_id)
+            return
+        
+        self._pending_db_ids[object_id] = future
+        if len(self._pending_db_ids) > 256:
+            # Objetos descartados antes de agendarse no deben acumular futures
+            self._pending_db_ids.popitem(last=False)
+    
+    async def _resolve_classification_id(self, classification_id) -> Optional[int]:
+        """Devuelve el id de BD, esperando al escritor por lotes si aún está pendiente"""
+        if isinstance(classification_id, asyncio.Future):
+            return await classification_id
+        return classification_id
+    
+    async def _db_writer_loop(self) -> None:
+        """Escribe clasificaciones en BD cada 64 registros o cada segundo"""
+        loop = asyncio.get_running_loop()
+        batch_size = 64
+        max_delay_s = 1.0
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        futures: List[asyncio.Future] = []
+        
+        try:
+            while True:
+                batch.append(await self._db_queue.get())
+                deadline = loop.time() + max_delay_s
+                
+                while len(batch) < batch_size:
+                    try:
+                        batch.append(self._db_queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        pass
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._db_queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                
+                records = [record for record, _ in batch]
+                futures = [future for _, future in batch]
+                batch = []
+                try:
+                    ids = await loop.run_in_executor(self._db_pool, self._write_classifications, records)
+                except Exception as e:
+                    self.logger.warning(f"Error registrando {len(records)} clasificaciones en BD: {e}")
+                    ids = [None] * len(records)
+                
+                for future, db_id in zip(futures, ids):
+                    if not future.done():
+                        future.set_result(db_id)
+                futures = []
+        finally:
+            # Lote en vuelo interrumpido: no dejar desviaciones esperando un id
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+            
+            # Volcar lo pendiente al cancelar la tarea (shutdown)
+            while not self._db_queue.empty():
+                batch.append(self._db_queue.get_nowait())
+            if batch:
+                try:
+                    ids = self._write_classifications([record for record, _ in batch])
+                except Exception as e:
+                    self.logger.warning(f"Error volcando clasificaciones pendientes: {e}")
+                    ids = [None] * len(batch)
+                for (_, future), db_id in zip(batch, ids):
+                    if not future.done():
+                        future.set_result(db_id)
+    
+    def _write_classifications(self, records: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """Escribe un lote de clasificaciones en BD y devuelve sus ids (bloqueante)"""
+        database = self.components.database
+        if not database:
+            return [None] * len(records)
+        if hasattr(database, 'record_classifications_bulk'):
+            return list(database.record_classifications_bulk(records))
+        return [database.record_classification(**record) for record in records]
     
     async def _schedule_diversion(self, object_id: int, classification_id: int, 
-                                 category_index: int, detection_time: float, confidence: float) -> None:
+                                 category_index: int, detection_time: float, confidence: float,
+                                 class_names: Optional[List[str]] = None,
+                                 not_diverted: Optional[List[int]] = None) -> None:
         """Agenda la activación de un desviador con validaciones mejoradas"""
         try:
-            system_class_names = self.config.get('ai_model_settings', 'class_names')
+            system_class_names = class_names if class_names is not None else self._class_names
             if category_index < 0 or category_index >= len(system_class_names):
-                self.logger.warning(f"Índice de categoría inválido: {category_index}")
+                self.logger.warning("Índice de categoría inválido: %s", category_index)
                 return
 
             category_name = system_class_names[category_index]
             
-            # Verificar si requiere desviación
-            distances = self.config.get('conveyor_belt_settings', 'distance_camera_to_diverters_m', {})
+            # Verificar si requiere desviación (tabla de retardos precalculada)
+            cfg = self._cached_cfg
+            delay_s = cfg.diversion_delays.get(category_name)
             
-            if category_name.lower() == 'other' or category_name not in distances:
-                self.logger.info(f"Objeto {object_id} ({category_name}) no requiere desviación")
-                if self.components.database:
-                    try:
-                        self.components.database.update_classification_diversion_status(
-                            classification_id, diverter_activated=False
-                        )
-                    except Exception as e:
-                        self.logger.warning(f"Error actualizando BD: {e}")
+            if classification_id is None:
+                classification_id = self._pending_db_ids.pop(object_id, None)
+            
+            if delay_s is None:
+                self.logger.info("Objeto %d (%s) no requiere desviación", object_id, category_name)
+                if classification_id is None or isinstance(classification_id, asyncio.Future):
+                    # Aún en el lote: el registro ya se escribe con diverter_activated=False
+                    pass
+                elif not_diverted is not None:
+                    not_diverted.append(classification_id)
+                else:
+                    self._mark_not_diverted([classification_id])
                 return
 
-            # Calcular delay
-            distance = distances[category_name]
-            belt_speed = self.config.get('conveyor_belt_settings', 'belt_speed_mps', 0.1)
-            
-            if belt_speed <= 0:
-                raise ValueError(f"Velocidad de banda inválida: {belt_speed}")
-            
-            delay_s = distance / belt_speed
+            if cfg.belt_speed <= 0:
+                raise ValueError(f"Velocidad de banda inválida: {cfg.belt_speed}")
             
             # Validar delay razonable
             if delay_s > 30:  # Más de 30 segundos es sospechoso
-                self.logger.warning(f"Delay muy largo para objeto {object_id}: {delay_s:.1f}s")
+                self.logger.warning("Delay muy largo para objeto %d: %.1fs", object_id, delay_s)
                 return
             
             # Verificar que el desviador esté disponible
             if hasattr(self.components, 'diverter_manager'):
                 diverter_status = self.components.diverter_manager.get_diverter_status(category_name)
                 if diverter_status and diverter_status.state not in [ActuatorState.IDLE, ActuatorState.DISABLED]:
-                    self.logger.warning(f"Desviador {category_name} ocupado, omitiendo objeto {object_id}")
+                    self.logger.warning("Desviador %s ocupado, omitiendo objeto %d", category_name, object_id)
                     return
             
-            # Crear y ejecutar tarea de desviación
-            task = threading.Thread(
-                target=self._diversion_task,
-                args=(object_id, classification_id, category_name, category_index, delay_s),
-                daemon=True,
-                name=f'Diversion-{object_id}'
-            )
+            # Anclar al instante de captura (reloj monotónico): la latencia de cola e inferencia ya corrió
+            now = time.monotonic()
+            activation_time = detection_time + delay_s
+            if activation_time <= now:
+                self.logger.warning("Objeto %d (%s) ya pasó el desviador (%.0f ms tarde), omitiendo",
+                                    object_id, category_name, (now - activation_time) * 1000)
+                if classification_id is not None and not isinstance(classification_id, asyncio.Future):
+                    if not_diverted is not None:
+                        not_diverted.append(classification_id)
+                    else:
+                        self._mark_not_diverted([classification_id])
+                return
             
-            self.active_diversions[object_id] = {
-                'thread': task,
-                'classification_id': classification_id,
-                'activation_time': time.time() + delay_s,
-                'category': category_name,
-                'confidence': confidence,
-                'created_time': time.time()
-            }
+            # Agendar en el heap; la tarea despachadora la dispara al vencer
+            if not self.active_diversions.add(object_id, activation_time, now,
+                                              category_name, classification_id, confidence):
+                self.logger.warning("Límite de desviaciones simultáneas (%d) alcanzado, omitiendo objeto %d",
+                                    self.active_diversions.capacity, object_id)
+                return
+            heapq.heappush(self._diversion_heap, (activation_time, object_id))
+            if self._diversion_heap[0][1] == object_id:
+                self._diversion_wakeup.set()  # Nueva próxima activación: reprogramar el temporizador
             
-            task.start()
             self.metrics.diversions_attempted += 1
             
-            self.logger.info(f"Desviación agendada para objeto {object_id} ({category_name}) en {delay_s:.2f}s")
+            self.logger.info("Desviación agendada para objeto %d (%s) en %.2fs", object_id, category_name,
+                             activation_time - now)
             
         except Exception as e:
             self.logger.error(f"Error agendando desviación para objeto {object_id}: {e}")
     
-    def _diversion_task(self, object_id: int, classification_id: int, category_name: str, 
-                       category_index: int, delay_s: float) -> None:
-        """Tarea de desviación ejecutada en hilo separado con mejoras de seguridad"""
-        start_time = time.time()
-        
-        try:
-            self.logger.info(f"Esperando {delay_s:.2f}s para desviar objeto {object_id} ({category_name})")
-            
-            # Esperar con verificaciones periódicas
-            sleep_interval = 0.1
-            elapsed = 0
-            
-            while elapsed < delay_s:
-                # Verificar si el sistema sigue funcionando
-                if not self._running or self._shutdown_event.is_set():
-                    self.logger.info(f"Cancelando desviación para objeto {object_id} - sistema detenido")
-                    return
-                
-                # Verificar parada de emergencia
-                if (self.components.security_manager and 
-                    self.components.security_manager.emergency_stop_active):
-                    self.logger.warning(f"Cancelando desviación para objeto {object_id} - parada de emergencia")
-                    return
-                
-                time.sleep(min(sleep_interval, delay_s - elapsed))
-                elapsed = time.time() - start_time
+    def _dispatch_due_diversions(self, now: float) -> None:
+        """Dispara las desviaciones del heap cuyo instante de activación ya venció"""
+        heap = self._diversion_heap
+        while heap and heap[0][0] <= now:
+            _, object_id = heapq.heappop(heap)
+            diversions = self.active_diversions
+            row = diversions.row(object_id)
+            if row is None:
+                continue
+            
+            flags = self._flags
+            
+            # Verificar si el sistema sigue funcionando
+            if (flags & (FLAG_RUNNING | FLAG_SHUTDOWN)) != FLAG_RUNNING:
+                self.logger.info("Cancelando desviación para objeto %d - sistema detenido", object_id)
+                diversions.remove(object_id)
+                continue
+            
+            # Verificar parada de emergencia
+            if flags & FLAG_EMERGENCY:
+                self.logger.warning("Cancelando desviación para objeto %d - parada de emergencia", object_id)
+                diversions.remove(object_id)
+                continue
             
+            try:
+                self._div_queue.put_nowait(
+                    (object_id, diversions.classification_ids[row], diversions.categories[row])
+                )
+            except asyncio.QueueFull:
+                self.logger.error("Queue de desviaciones llena, omitiendo objeto %d", object_id)
+                diversions.remove(object_id)
+    
+    def _diversion_worker_count(self) -> int:
+        """Workers de desviación: `diverter_workers` o uno por desviador (mínimo dos)"""
+        configured = self.config.get('system_settings', 'diverter_workers')
+        if configured:
+            return max(1, int(configured))
+        diverters = self.config.get('diverter_control_settings', 'diverters', {}) or {}
+        return max(2, len(diverters))
+    
+    def _start_diversion_workers(self) -> None:
+        """Lanza el pool fijo de workers de desviación"""
+        if self._diversion_workers:
+            return
+        self._diversion_workers = [
+            asyncio.create_task(self._diversion_worker(), name=f'DiversionWorker-{i}')
+            for i in range(self._num_diversion_workers)
+        ]
+    
+    async def _diversion_worker(self) -> None:
+        """Ejecuta desviaciones vencidas tomadas de la queue"""
+        while True:
+            object_id, classification_id, category_name = await self._div_queue.get()
+            try:
+                await self._diversion_task(object_id, classification_id, category_name)
+            finally:
+                self._div_queue.task_done()
+    
+    async def _diversion_scheduler(self) -> None:
+        """Temporizador único: duerme hasta la próxima activación del heap y la despacha"""
+        wakeup = self._diversion_wakeup
+        monotonic = time.monotonic
+        while True:
+            wakeup.clear()
+            # Disparar desviaciones vencidas (también las descarta en emergencia); las que vencen
+            # dentro de la ventana de agrupación salen en el mismo tick en vez de rearmar el timer
+            self._dispatch_due_diversions(monotonic() + self._cached_cfg.diversion_coalesce_s)
+            
+            timeout = self._next_diversion_time() - monotonic()
+            if await self._wait_for_shutdown(None if timeout == float('inf') else timeout, wakeup):
+                return
+    
+    def _next_diversion_time(self) -> float:
+        """Instante monotónico de la próxima desviación agendada (inf si no hay)"""
+        return self._diversion_heap[0][0] if self._diversion_heap else float('inf')
+    
+    async def _diversion_task(self, object_id: int, classification_id: int, category_name: str) -> None:
+        """Acciona el desviador de un objeto vencido en el pool de hardware"""
+        try:
             # Activar desviador
-            actuation_start = time.time()
-            success = self._activate_diverter(category_name)
-            actuation_time_ms = (time.time() - actuation_start) * 1000
+            actuation_start = time.monotonic()
+            loop = asyncio.get_running_loop()
+            success = await loop.run_in_executor(self._hw_pool, self._activate_diverter, category_name)
+            actuation_time_ms = (time.monotonic() - actuation_start) * 1000
             
+            self._metrics_dirty = True
             if success:
                 self.metrics.diversions_successful += 1
-                self.logger.info(f"Desviación exitosa para objeto {object_id} ({category_name}) "
-                               f"en {actuation_time_ms:.1f}ms")
+                self._diverted_bins.add(category_name)
+                self._bin_check_event.set()
+                self.logger.info("Desviación exitosa para objeto %d (%s) en %.1fms",
+                                 object_id, category_name, actuation_time_ms)
             else:
-                self.logger.error(f"Fallo en desviación para objeto {object_id} ({category_name})")
+                self.logger.error("Fallo en desviación para objeto %d (%s)", object_id, category_name)
             
             # Actualizar base de datos
-            if self.components.database:
-                try:
-                    self.components.database.update_classification_diversion_status(
-                        classification_id=classification_id,
-                        diverter_activated=success,
-                        actuation_time_ms=actuation_time_ms,
-                        error_message=None if success else f"Fallo activando desviador {category_name}"
-                    )
-                except Exception as e:
-                    self.logger.warning(f"Error actualizando BD para objeto {object_id}: {e}")
+            await self._safe_db_update(
+                object_id, classification_id,
+                diverter_activated=success,
+                actuation_time_ms=actuation_time_ms,
+                error_message=None if success else f"Fallo activando desviador {category_name}"
+            )
             
         except Exception as e:
-            self.logger.error(f"Error en tarea de desviación para objeto {object_id}: {e}")
-            
-            if self.components.database:
-                try:
-                    self.components.database.update_classification_diversion_status(
-                        classification_id=classification_id,
-                        diverter_activated=False,
-                        error_message=str(e)
-                    )
-                except Exception as e:
-                    self.logger.warning(f"Error actualizando BD con error: {e}")
+            self.logger.error("Error en tarea de desviación para objeto %d: %s", object_id, e)
+            await self._safe_db_update(object_id, classification_id,
+                                       diverter_activated=False, error_message=str(e))
                     
         finally:
             # Limpiar de diversiones activas
-            if object_id in self.active_diversions:
-                del self.active_diversions[object_id]
+            self.active_diversions.remove(object_id)
+    
+    async def _safe_db_update(self, object_id: int, classification_id: Any, **fields) -> None:
+        """Encola el resultado de una desviación en BD; los fallos solo se registran"""
+        if not self.components.database:
+            return
+        try:
+            fields['classification_id'] = await self._resolve_classification_id(classification_id)
+            self._diversion_writer.submit(fields)
+        except Exception as e:
+            self.logger.warning("Error actualizando BD para objeto %d: %s", object_id, e)
+    
+    def _bind_hardware_modules(self) -> None:
+        """Enlaza una vez los módulos de control de bajo nivel usados por objeto"""
+        from Control_Banda.RPi_control_bajo_nivel import motor_driver_interface
+        from Control_Banda.RPi_control_bajo_nivel import sensor_interface as band_sensors
+        
+        self._motor_driver = motor_driver_interface
+        self._band_sensors = band_sensors
     
     def _activate_diverter(self, category_name: str) -> bool:
         """Activa un desviador específico con validaciones"""
         try:
-            from Control_Banda.RPi_control_bajo_nivel import motor_driver_interface
-            
-            duration = self.config.get('conveyor_belt_settings', 'diverter_activation_duration_s', 0.75)
+            if self._motor_driver is None:
+                self._bind_hardware_modules()
             
-            # Validar duración
-            if duration <= 0 or duration > 10:
-                self.logger.warning(f"Duración de activación inválida: {duration}s")
-                duration = 0.75
-            
-            return motor_driver_interface.activate_diverter(category_name, duration)
+            # Duración ya validada al cargar la configuración
+            return self._motor_driver.activate_diverter(category_name, self._cached_cfg.diverter_duration)
             
         except Exception as e:
-            self.logger.error(f"Error activando desviador {category_name}: {e}")
+            self.logger.error("Error activando desviador %s: %s", category_name, e)
             return False
     
-    async def _check_bin_levels(self) -> None:
-        """Verifica niveles de tolvas con alertas mejoradas"""
+    async def _bin_level_monitor(self) -> None:
+        """Verifica niveles de tolva tras desviaciones (con espaciado mínimo) o cada intervalo inactivo"""
+        min_interval = self.config.get('system_settings', 'bin_check_interval_s', 30)
+        # Sin desviaciones nuevas los niveles solo cambian al vaciar tolvas: verificar con menos frecuencia
+        idle_interval = self.config.get('system_settings', 'bin_check_idle_interval_s', 300)
+        loop = asyncio.get_running_loop()
+        read_all = True  # Primera lectura y tras el intervalo inactivo: todas las tolvas
+        
+        while True:
+            self._bin_check_event.clear()
+            diverted, self._diverted_bins = self._diverted_bins, set()
+            await self._check_bin_levels(None if read_all else diverted)
+            last_check = loop.time()
+            
+            if await self._wait_for_shutdown(idle_interval, self._bin_check_event):
+                return
+            read_all = not self._bin_check_event.is_set()
+            
+            # Hubo desviaciones: respetar el intervalo mínimo entre lecturas de hardware
+            remaining = min_interval - (loop.time() - last_check)
+            if remaining > 0 and await self._wait_for_shutdown(remaining):
+                return
+    
+    async def _check_bin_levels(self, bins: Optional[Set[str]] = None) -> None:
+        """Verifica niveles de tolvas (todas, o solo las indicadas) con alertas mejoradas"""
         try:
-            from Control_Banda.RPi_control_bajo_nivel import sensor_interface as band_sensors
+            if self._band_sensors is None:
+                self._bind_hardware_modules()
             
-            levels = band_sensors.get_all_bin_fill_levels()
+            # Lectura de sensores bloqueante fuera del event loop
+            loop = asyncio.get_running_loop()
+            if bins is None:
+                levels = await loop.run_in_executor(self._hw_pool, self._band_sensors.get_all_bin_fill_levels)
+            else:
+                levels = await loop.run_in_executor(self._hw_pool, self._read_bin_levels, bins)
             
             for bin_name, level in levels.items():
                 if level is not None:
-                    self.logger.debug(f"Nivel tolva {bin_name}: {level:.1f}%")
+                    self._process_bin_level(bin_name, level)
                     
-                    # Actualizar en base de datos
-                    if self.components.database:
-                        try:
-                            threshold = self.config.get('sensors_settings', 'bin_level_sensors', 
-                                                      'settings_common', 'full_threshold_percent', 80.0)
-                            critical_threshold = self.config.get('sensors_settings', 'bin_level_sensors',
-                                                               'settings_common', 'critical_threshold_percent', 95.0)
-                            
-                            alert_triggered = level > threshold
-                            critical_alert = level > critical_threshold
-                            
-                            self.components.database.update_bin_status(bin_name, level, alert_triggered)
-                            
-                            # Generar alertas
-                            if critical_alert:
-                                self.logger.critical(f"ALERTA CRÍTICA: Tolva {bin_name} al {level:.1f}%")
-                                self.components.database.log_system_event(
-                                    'alert', 'critical',
-                                    f'Tolva {bin_name} al {level:.1f}% - ACCIÓN REQUERIDA',
-                                    {'bin': bin_name, 'level': level, 'threshold': critical_threshold}
-                                )
-                                
-                                # Considerar pausar sistema si está muy lleno
-                                if level > 98:
-                                    self.logger.critical(f"Tolva {bin_name} al {level:.1f}% - PAUSANDO SISTEMA")
-                                    self.pause()
-                                    
-                            elif alert_triggered:
-                                self.logger.warning(f"ALERTA: Tolva {bin_name} al {level:.1f}%")
-                                self.components.database.log_system_event(
-                                    'alert', 'warning',
-                                    f'Tolva {bin_name} al {level:.1f}%',
-                                    {'bin': bin_name, 'level': level, 'threshold': threshold}
-                                )
-                        except Exception as e:
-                            self.logger.warning(f"Error actualizando estado de tolva {bin_name}: {e}")
-                            
         except Exception as e:
-            self.logger.error(f"Error verificando niveles de tolva: {e}")
+            self.logger.error("Error verificando niveles de tolva: %s", e)
+    
+    def _read_bin_levels(self, bins: Set[str]) -> Dict[str, Optional[float]]:
+        """Lee solo las tolvas indicadas que tienen sensor configurado (bloqueante)"""
+        sensors = self._band_sensors
+        configured = sensors.bin_specific_configs
+        return {name: sensors.get_bin_fill_level(name) for name in bins if name in configured}
+    
+    def _process_bin_level(self, bin_name: str, level: float) -> None:
+        """Evalúa umbrales de una tolva y registra su estado y alertas"""
+        self.logger.debug("Nivel tolva %s: %.1f%%", bin_name, level)
+        
+        # Actualizar en base de datos
+        if not self.components.database:
+            return
+        
+        cfg = self._cached_cfg
+        threshold = cfg.bin_full_threshold
+        critical_threshold = cfg.bin_critical_threshold
+        try:
+            alert_triggered = level > threshold
+            band = 2 if level > critical_threshold else 1 if alert_triggered else 0
+            
+            # Considerar pausar sistema si está muy lleno (se evalúa en cada sondeo)
+            if band == 2 and level > 98:
+                self.logger.critical("Tolva %s al %.1f%% - PAUSANDO SISTEMA", bin_name, level)
+                self.pause()
+            
+            # Sin cambio de banda ni variación significativa: nada que registrar
+            prev = self._last_bin_levels.get(bin_name)
+            prev_band = self._bin_bands.get(bin_name, 0)
+            if prev is not None and band == prev_band and abs(level - prev) < cfg.bin_level_epsilon:
+                return
+            self._last_bin_levels[bin_name] = level
+            self._bin_bands[bin_name] = band
+            
+            self._event_log.update_bin_status(bin_name, level, alert_triggered)
+            
+            # Generar alertas solo al entrar en una banda de alerta
+            if band == prev_band or band == 0:
+                return
+            
+            templates = self._bin_alert_templates.get(bin_name)
+            if templates is None:
+                escaped = bin_name.replace('%', '%%')
+                templates = (f'Tolva {escaped} al %.1f%%', f'Tolva {escaped} al %.1f%% - ACCIÓN REQUERIDA')
+                self._bin_alert_templates[bin_name] = templates
+            
+            # El dict de detalles es propio de cada evento: EventLogWriter lo escribe más tarde
+            if band == 2:
+                self.logger.critical("ALERTA CRÍTICA: Tolva %s al %.1f%%", bin_name, level)
+                self._event_log.log_event(
+                    'alert', 'critical', templates[1] % level,
+                    {'bin': bin_name, 'level': level, 'threshold': critical_threshold}
+                )
+            
+            else:
+                self.logger.warning("ALERTA: Tolva %s al %.1f%%", bin_name, level)
+                self._event_log.log_event(
+                    'alert', 'warning', templates[0] % level,
+                    {'bin': bin_name, 'level': level, 'threshold': threshold}
+                )
+        except Exception as e:
+            self.logger.warning("Error actualizando estado de tolva %s: %s", bin_name, e)
+    
+    def _uptime_ns(self) -> int:
+        """Tiempo en marcha en ns, inmune a ajustes del reloj de pared"""
+        return time.monotonic_ns() - self._start_ns
     
     def _update_metrics(self) -> None:
         """Actualiza métricas del sistema con cálculos avanzados"""
-        self.metrics.system_uptime = time.time() - self.start_time
+        self.metrics.system_uptime = self._uptime_ns() / 1e9
+        self.metrics.objects_dropped = self.object_queue.dropped
+        self._status_gen += 1
         
-        # Calcular tasa de éxito
-        if self.metrics.objects_processed > 0:
-            success_rate = (self.metrics.successful_classifications / self.metrics.objects_processed) * 100
-            diversion_rate = (self.metrics.diversions_successful / max(self.metrics.diversions_attempted, 1)) * 100
-            
-            # Log métricas periódicamente
-            if self.metrics.objects_processed % 100 == 0:  # Cada 100 objetos
-                self.logger.info(f"Métricas del sistema - Objetos: {self.metrics.objects_processed}, "
-                               f"Éxito clasificación: {success_rate:.1f}%, "
-                               f"Éxito desviación: {diversion_rate:.1f}%")
+        # Promedio móvil de los últimos tiempos de procesamiento, en una reducción vectorizada
+        if self._recent_times:
+            recent = np.fromiter(self._recent_times, dtype=np.float32, count=len(self._recent_times))
+            self.metrics.average_processing_time_ms = float(recent.mean())
+    
+    async def _metrics_reporter(self) -> None:
+        """Registra periódicamente las tasas de éxito (fuera del camino por objeto)"""
+        interval = self.config.get('system_settings', 'metrics_log_interval_s', 60)
+        # Empezar en 0: sin objetos procesados no hay tasa que dividir
+        last_reported = 0
+        
+        while not await self._wait_for_shutdown(interval):
+            metrics = self.metrics
+            if metrics.objects_processed == last_reported:
+                continue
+            last_reported = metrics.objects_processed
+            
+            success_rate = (metrics.successful_classifications / metrics.objects_processed) * 100
+            diversion_rate = (metrics.diversions_successful / max(metrics.diversions_attempted, 1)) * 100
+            self.logger.info("Métricas del sistema - Objetos: %d, Éxito clasificación: %.1f%%, "
+                             "Éxito desviación: %.1f%%",
+                             metrics.objects_processed, success_rate, diversion_rate)
+
+
+@lru_cache(maxsize=None)
+def _build_arg_parser() -> argparse.ArgumentParser:
+    """Construye (una sola vez) el parser de argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description='EcoSort Industrial v2.1 - Sistema de Clasificación de Residuos')
+    parser.add_argument('--config', '-c', default='Control_Banda/config_industrial.json',
+                      help='Archivo de configuración')
+    parser.add_argument('--debug', '-d', action='store_true',
+                      help='Activar modo debug')
+    parser.add_argument('--simulation', '-s', action='store_true',
+                      help='Modo simulación (sin hardware)')
+    parser.add_argument('--maintenance', '-m', action='store_true',
+                      help='Iniciar en modo mantenimiento')
+    return parser
 
 
 async def main():
@@ -2256,18 +4004,7 @@ async def main():
     system = None
     try:
         # Verificar argumentos de línea de comandos
-        import argparse
-        parser = argparse.ArgumentParser(description='EcoSort Industrial v2.1 - Sistema de Clasificación de Residuos')
-        parser.add_argument('--config', '-c', default='Control_Banda/config_industrial.json',
-                          help='Archivo de configuración')
-        parser.add_argument('--debug', '-d', action='store_true',
-                          help='Activar modo debug')
-        parser.add_argument('--simulation', '-s', action='store_true',
-                          help='Modo simulación (sin hardware)')
-        parser.add_argument('--maintenance', '-m', action='store_true',
-                          help='Iniciar en modo mantenimiento')
-        
-        args = parser.parse_args()
+        args = _build_arg_parser().parse_args()
         
         # Configurar nivel de logging
         if args.debug:
@@ -2307,8 +4044,7 @@ async def main():
         
         logger.info("=" * 50)
         
-        # Verificar niveles iniciales
-        await system._check_bin_levels()
+        # Los niveles iniciales los verifica el monitor de tolvas al arrancar
         
         # Mostrar estado de componentes
         component_status = system.components.get_component_status()
@@ -2334,13 +4070,16 @@ async def main():
             # Mantener sistema vivo en modo mantenimiento
             try:
                 while system.state == SystemState.MAINTENANCE:
-                    await asyncio.sleep(1)
+                    if await system._wait_for_shutdown(event=system._state_changed):
+                        break
+                    system._state_changed.clear()
                     
                 # Si sale de mantenimiento, iniciar operación
                 if system.state == SystemState.IDLE:
                     await system.start()
                     
             except KeyboardInterrupt:
+                system._state_changed.set()
                 logger.info("Saliendo del modo mantenimiento...")
 
     except KeyboardInterrupt:
@@ -2373,6 +4112,20 @@ async def main():
                 logger.error(f"Error en limpieza final: {e}")
 
 
+def _write_report(report_data: Dict[str, Any], report_file: str) -> None:
+    """Escribe el reporte JSON (orjson en bytes si está disponible)"""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(
+            report_data, default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        with open(report_file, 'wb') as f:
+            f.write(payload)
+    else:
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report_data, f, indent=2, ensure_ascii=False, default=str)
+
+
 async def generate_final_report(system: EcoSortSystem) -> None:
     """Genera reporte final del sistema"""
     try:
@@ -2381,15 +4134,11 @@ async def generate_final_report(system: EcoSortSystem) -> None:
         
         os.makedirs('reports', exist_ok=True)
         
-        report_data = {
-            'timestamp': timestamp,
-            'system_status': system.get_status(),
-            'diagnostics': system.get_detailed_diagnostics(),
-            'configuration': system.config.get_all()
-        }
+        report_data = {'timestamp': timestamp, **system.snapshot_all()}
         
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False, default=str)
+        # Serialización y escritura fuera del event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_report, report_data, report_file)
         
         logger.info(f"Reporte final generado: {report_file}")
         
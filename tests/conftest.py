@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuración común de pytest para EcoSort Industrial v2.1
+
+Autores: Gabriel Calderón, Elias Bautista, Cristian Hernandez
+Fecha: Junio de 2025
+"""
+
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Event loop en C para las pruebas asíncronas (pytest-asyncio crea sus loops desde la política)
+if UVLOOP_AVAILABLE and sys.platform != "win32":
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+# Configuración mínima válida; cada prueba sustituye solo las secciones que necesita
+BASE_CONFIG = {
+    "version": "2.1",
+    "camera_settings": {"index": 0, "frame_width": 640, "frame_height": 480},
+    "ai_model_settings": {
+        "model_path": "test_model.pt",
+        "class_names": ["metal", "plastic", "glass"],
+        "min_confidence": 0.5
+    },
+    "conveyor_belt_settings": {
+        "belt_speed_mps": 0.1,
+        "distance_camera_to_diverters_m": {"metal": 0.5}
+    },
+    "sensors_settings": {"camera_trigger_sensor": {"pin_bcm": 18}},
+    "diverter_control_settings": {
+        "diverters": {
+            "metal": {"type": "stepper_A4988", "dir_pin_bcm": 2, "step_pin_bcm": 3}
+        }
+    },
+    "system_settings": {"bin_check_interval_s": 10}
+}
+
+
+@pytest.fixture(scope="session")
+def write_config(tmp_path_factory):
+    """Fábrica que escribe BASE_CONFIG sustituyendo secciones completas (no se fusionan) y devuelve la ruta"""
+    def make(name: str, **overrides) -> str:
+        config_file = tmp_path_factory.mktemp(name) / 'config.json'
+        config_file.write_text(json.dumps({**BASE_CONFIG, **overrides}))
+        return str(config_file)
+    return make
+
+
+@pytest.fixture
+def fake_camera():
+    """Fábrica de cámaras simuladas ligeras (sin Mock) para pruebas que no verifican llamadas"""
+    def make(opened: bool = True, frame=None, width: int = 640) -> SimpleNamespace:
+        ok = frame is not None
+        return SimpleNamespace(
+            isOpened=lambda: opened,
+            read=lambda *args: (ok, frame),
+            # Ritmo de ~200 FPS para que el hilo de captura no gire en vacío
+            grab=lambda: time.sleep(0.005) or ok,
+            retrieve=lambda *args: (ok, frame),
+            get=lambda prop: width,
+            set=lambda prop, value: True,
+            release=lambda: None,
+        )
+    return make
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    """Reloj simulado: time.time y time.monotonic_ns quedan fijos hasta llamar a advance()"""
+    clock = SimpleNamespace(now=1000.0)
+    clock.advance = lambda seconds: setattr(clock, 'now', clock.now + seconds)
+    monkeypatch.setattr(time, 'time', lambda: clock.now)
+    # El event loop usa time.monotonic, que no se toca
+    monkeypatch.setattr(time, 'monotonic_ns', lambda: int(clock.now * 1e9))
+    return clock
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de integración del sistema completo (hardware simulado) - EcoSort Industrial v2.1
+
+Autores: Gabriel Calderón, Elias Bautista, Cristian Hernandez
+Fecha: Junio de 2025
+"""
+
+import pytest
+import importlib
+import importlib.util
+import time
+from unittest.mock import Mock, patch, AsyncMock
+from dataclasses import dataclass
+from types import SimpleNamespace
+import cv2
+import numpy as np
+
+# Importar módulos del sistema
+import sys
+sys.path.append('..')
+
+import main_sistema_banda
+from main_sistema_banda import (
+    EcoSortSystem, ErrorRecoveryManager, SecurityManager,
+    PerformanceMonitor, SystemState, ErrorSeverity, HardwareError
+)
+
+# Frame negro compartido de solo lectura (evita asignar ~900KB por prueba)
+_BLANK_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+_BLANK_FRAME.flags.writeable = False
+
+
+# Módulos que las pruebas sustituyen por mocks; patch/monkeypatch necesitan poder importarlos
+_HW_MODULES = (
+    'Control_Banda.RPi_control_bajo_nivel.sensor_interface',
+    'Control_Banda.RPi_control_bajo_nivel.conveyor_belt_controller',
+    'Control_Banda.RPi_control_bajo_nivel.motor_driver_interface',
+    'IA_Clasificacion.Trash_detect',
+    'yaml',  # Dependencia de Trash_detect
+)
+
+
+def _has_hw_modules() -> bool:
+    """True si todos los módulos de hardware e IA a simular están disponibles"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in _HW_MODULES)
+    except ModuleNotFoundError:
+        return False
+
+
+# Solo las pruebas que simulan esos módulos se omiten en runners que no los tienen
+requires_hw_modules = pytest.mark.skipif(not _has_hw_modules(), reason="módulos de hardware/IA no disponibles")
+
+
+@dataclass
+class HwMocks:
+    """Mocks del hardware y del detector de IA usados por las pruebas de integración"""
+    camera: SimpleNamespace
+    sensors: Mock
+    belt: Mock
+    motors: Mock
+    ai: Mock
+    gpio: Mock
+
+
+@pytest.mark.integration
+class TestIntegration:
+    """Tests de integración del sistema completo"""
+    
+    @pytest.fixture(scope="session")
+    def full_system_config_file(self, write_config, tmp_path_factory):
+        """Configuración completa para pruebas de integración, escrita una vez por sesión"""
+        # El detector se simula, pero la validación del modelo exige un archivo de al menos 1KB
+        model_file = tmp_path_factory.mktemp('model') / 'test_model.pt'
+        model_file.write_bytes(bytes(2048))
+        return write_config(
+            'integration',
+            camera_settings={"index": 0, "frame_width": 640, "frame_height": 480, "warmup_frames": 2},
+            ai_model_settings={
+                "model_path": str(model_file),
+                "class_names": ["metal", "plastic", "glass", "carton", "other"],
+                "min_confidence": 0.5
+            },
+            conveyor_belt_settings={
+                "belt_speed_mps": 0.1,
+                "distance_camera_to_diverters_m": {"metal": 0.5, "plastic": 0.7, "glass": 0.9},
+                "diverter_activation_duration_s": 0.5
+            },
+            sensors_settings={
+                "camera_trigger_sensor": {"pin_bcm": 18},
+                "bin_level_sensors": {
+                    "enabled": True,
+                    "sensors": {"metal_bin": {"trigger_pin_bcm": 24, "echo_pin_bcm": 25}}
+                }
+            },
+            diverter_control_settings={
+                "diverters": {
+                    "metal": {"type": "stepper_A4988", "dir_pin_bcm": 2, "step_pin_bcm": 3,
+                              "steps_per_activation": 200},
+                    "plastic": {"type": "gpio_on_off", "pin_bcm": 7, "active_state": "HIGH"}
+                }
+            },
+            system_settings={"bin_check_interval_s": 5, "save_images": False, "max_processing_errors": 5},
+            database_settings={"enabled": False},
+            api_settings={"enabled": False}
+        )
+    
+    @pytest.fixture
+    def mocked_hw(self, monkeypatch, fake_camera):
+        """Hardware e IA simulados con las respuestas por defecto; monkeypatch los restaura al terminar"""
+        camera = fake_camera(frame=_BLANK_FRAME, width=640)
+        
+        ai = Mock()
+        ai.detect_objects.return_value = [('metal', 0.85, (100, 100, 200, 200))]
+        ai.model_class_names = ['metal', 'plastic', 'glass']
+        
+        sensors = Mock()
+        sensors.load_sensor_config_from_dict.return_value = True
+        sensors.setup_sensor_gpio.return_value = True
+        sensors.check_camera_trigger.return_value = False
+        sensors.get_all_bin_fill_levels.return_value = {'metal_bin': 50.0}
+        
+        belt = Mock()
+        belt.load_belt_config_from_dict.return_value = True
+        belt.setup_belt_gpio.return_value = True
+        belt.get_belt_status.return_value = {'is_running': False}
+        belt.start_belt.return_value = True
+        
+        motors = Mock()
+        motors.load_diverter_configuration_from_dict.return_value = True
+        motors.setup_diverter_gpio.return_value = True
+        motors.activate_diverter.return_value = True
+        
+        for module in (sensors, belt, motors):
+            module.get_claimed_pins.return_value = []
+        
+        mocks = HwMocks(camera=camera, sensors=sensors, belt=belt, motors=motors, ai=ai, gpio=Mock())
+        
+        # Sustituir atributos de módulos ya importados (los destinos en texto exigen importarlos antes)
+        hw_package = importlib.import_module('Control_Banda.RPi_control_bajo_nivel')
+        for name in ('sensor_interface', 'conveyor_belt_controller', 'motor_driver_interface'):
+            importlib.import_module(f'Control_Banda.RPi_control_bajo_nivel.{name}')
+        trash_detect = importlib.import_module('IA_Clasificacion.Trash_detect')
+        
+        monkeypatch.setattr(cv2, 'VideoCapture', Mock(return_value=camera))
+        monkeypatch.setattr(hw_package, 'sensor_interface', sensors)
+        monkeypatch.setattr(hw_package, 'conveyor_belt_controller', belt)
+        monkeypatch.setattr(hw_package, 'motor_driver_interface', motors)
+        monkeypatch.setattr(trash_detect, 'TrashDetector', Mock(return_value=ai))
+        monkeypatch.setattr(main_sistema_banda, 'GPIO', mocks.gpio)
+        return mocks
+    
+    @requires_hw_modules
+    @pytest.mark.asyncio
+    async def test_full_object_processing_simulation(self, full_system_config_file, mocked_hw):
+        """Test simulación completa de procesamiento de objeto"""
+        system = EcoSortSystem(full_system_config_file)
+        
+        try:
+            # Inicializar sistema
+            await system.initialize()
+            
+            assert system.state == SystemState.IDLE
+            assert system.components.is_initialized()
+            
+            # Simular procesamiento de objeto
+            test_image = _BLANK_FRAME
+            result = await system._classify_object(1, test_image, time.monotonic())
+            
+            assert result.object_id == 1
+            assert result.category_name == "metal"
+            assert result.confidence == 0.85
+            assert not result.is_error
+            
+            # Verificar métricas
+            system.metrics.objects_processed += 1
+            system.metrics.successful_classifications += 1
+            
+            status = system.get_status()
+            assert status['metrics']['objects_processed'] == 1
+            assert status['metrics']['successful_classifications'] == 1
+        finally:
+            # Detener hilo de captura, pools y tareas aunque falle la prueba (el worker sigue vivo)
+            await system.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_error_recovery_integration(self, full_system_config_file):
+        """Test integración del sistema de recuperación de errores"""
+        system = EcoSortSystem(full_system_config_file)
+        
+        # Inicializar componentes de recuperación
+        system.components.error_recovery = ErrorRecoveryManager(system.config)
+        system.components.security_manager = SecurityManager(system.config)
+        system.components.performance_monitor = PerformanceMonitor()
+        
+        # Simular error de hardware
+        hardware_error = HardwareError("GPIO initialization failed", ErrorSeverity.HIGH, 'gpio')
+        
+        # Mock de la estrategia registrada (el dict guarda el método ligado en __init__)
+        mock_recover = AsyncMock(return_value=True)
+        with patch.dict(system.components.error_recovery.recovery_strategies,
+                        {'hardware_failure': mock_recover}):
+            # Intentar recuperación
+            recovery_success = await system.components.error_recovery.handle_error(
+                hardware_error, system
+            )
+            
+            assert recovery_success is True
+            mock_recover.assert_called_once()
+
+
+if __name__ == "__main__":
+    # Ejecutar tests con configuración específica
+    pytest.main([
+        __file__,
+        "-v",
+        "--tb=short",
+        "--asyncio-mode=auto",
+        "--color=yes"
+    ]) 
\ No newline at end of file
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del sistema principal EcoSortSystem - EcoSort Industrial v2.1
+
+Autores: Gabriel Calderón, Elias Bautista, Cristian Hernandez
+Fecha: Junio de 2025
+"""
+
+import pytest
+import asyncio
+import time
+from unittest.mock import Mock, patch, AsyncMock
+
+# Importar módulos del sistema
+import sys
+sys.path.append('..')
+
+from main_sistema_banda import (
+    EcoSortSystem, ConfigManager, ComponentManager, SystemState,
+    SystemError, ClassificationResult, FLAG_RUNNING
+)
+
+# Claves obligatorias del reporte de estado (construidas una vez por módulo)
+_REQUIRED_STATUS_KEYS = frozenset({
+    'state', 'uptime_seconds', 'metrics', 'active_diversions',
+    'queue_size', 'components_initialized', 'component_status'
+})
+
+
+class TestEcoSortSystem:
+    """Tests para el sistema principal EcoSort"""
+    
+    @pytest.fixture(scope="session")
+    def mock_config_file(self, write_config):
+        """Crea archivo de configuración mock para pruebas, una vez por sesión"""
+        return write_config('system')
+    
+    @pytest.fixture 
+    def ecosort_system(self, mock_config_file):
+        """Instancia propia por prueba: sus primitivas asyncio se ligan al loop de cada prueba"""
+        return EcoSortSystem(mock_config_file)
+    
+    def test_system_initialization(self, ecosort_system):
+        """Test inicialización del sistema"""
+        assert ecosort_system.state == SystemState.INITIALIZING
+        assert ecosort_system.metrics.objects_processed == 0
+        assert isinstance(ecosort_system.config, ConfigManager)
+        assert isinstance(ecosort_system.components, ComponentManager)
+    
+    def test_signal_handler(self, ecosort_system):
+        """Test manejo de señales del sistema"""
+        with patch.object(ecosort_system, 'request_shutdown') as mock_shutdown:
+            ecosort_system._signal_handler(2, None)  # SIGINT
+            mock_shutdown.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_system_requirements_check(self, ecosort_system):
+        """Test verificación de requisitos del sistema"""
+        with patch('psutil.disk_usage') as mock_disk, \
+             patch('psutil.virtual_memory') as mock_memory:
+            
+            # Simular condiciones normales
+            mock_disk.return_value = Mock(free=2*1024**3)  # 2GB libre
+            mock_memory.return_value = Mock(available=1024*1024*1024)  # 1GB disponible
+            
+            # No debería lanzar excepción
+            await ecosort_system._check_system_requirements()
+            
+            # Simular poco espacio en disco
+            mock_disk.return_value = Mock(free=0.5*1024**3)  # 500MB libre
+            
+            with pytest.raises(SystemError):
+                await ecosort_system._check_system_requirements()
+    
+    @pytest.mark.asyncio
+    async def test_trigger_wait_is_event_driven(self, ecosort_system):
+        """Test espera de trigger por interrupción en lugar de sondeo"""
+        ecosort_system._trigger_interrupts = True
+        
+        # Sin flanco, la espera expira sin disparo
+        assert not await ecosort_system._wait_for_object_trigger(0.01)
+        
+        # El flanco llega desde otro hilo mientras se espera
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, ecosort_system._trigger_event.set)
+        assert await ecosort_system._wait_for_object_trigger(1.0)
+        assert not ecosort_system._trigger_event.is_set()
+    
+    @pytest.mark.asyncio
+    async def test_diversions_dispatched_from_heap(self, ecosort_system):
+        """Test las desviaciones se disparan desde el heap al vencer, en orden"""
+        ecosort_system._update_flags(set_mask=FLAG_RUNNING, clear_mask=0)
+        captured = time.monotonic()
+        
+        with patch.object(ecosort_system, '_diversion_task', new=AsyncMock()) as mock_task:
+            await ecosort_system._schedule_diversion(2, None, 0, captured, 0.9)
+            await ecosort_system._schedule_diversion(1, None, 0, captured - 1.0, 0.9)
+            
+            # Anclada a la captura, no al momento de agendar
+            assert ecosort_system._next_diversion_time() == pytest.approx(captured + 4.0)
+            
+            # Aún no vence ninguna
+            ecosort_system._dispatch_due_diversions(captured + 3.0)
+            mock_task.assert_not_called()
+            
+            ecosort_system._start_diversion_workers()
+            ecosort_system._dispatch_due_diversions(captured + 5.0)
+            await asyncio.wait_for(ecosort_system._div_queue.join(), timeout=1.0)
+            assert sorted(c.args[0] for c in mock_task.call_args_list) == [1, 2]
+            assert not ecosort_system._diversion_heap
+            
+            for worker in ecosort_system._diversion_workers:
+                worker.cancel()
+    
+    @pytest.mark.asyncio
+    async def test_late_diversion_dropped(self, ecosort_system):
+        """Test un objeto cuyo instante de desviación ya pasó no se agenda"""
+        await ecosort_system._schedule_diversion(3, None, 0, time.monotonic() - 10.0, 0.9)
+        
+        assert not ecosort_system._diversion_heap
+        assert ecosort_system.metrics.diversions_attempted == 0
+    
+    @pytest.mark.asyncio
+    async def test_object_queue_consumer_schedules_on_push(self, ecosort_system):
+        """Test el consumidor agenda la desviación en cuanto se encola un objeto"""
+        with patch.object(ecosort_system, '_schedule_diversion', new=AsyncMock()) as mock_schedule:
+            consumer = asyncio.create_task(ecosort_system._object_queue_consumer())
+            
+            ecosort_system.object_queue.push(1, None, 0, 0.0, 0.9)
+            ecosort_system._object_ready.set()
+            await asyncio.sleep(0.01)
+            
+            mock_schedule.assert_awaited_once()
+            assert not ecosort_system.object_queue
+            
+            ecosort_system._shutdown.set()
+            await asyncio.wait_for(consumer, timeout=1.0)
+    
+    @pytest.mark.asyncio
+    async def test_classifications_written_in_batches(self, ecosort_system):
+        """Test las clasificaciones se registran en BD en un solo lote"""
+        database = Mock()
+        database.record_classifications_bulk.return_value = [10, 11]
+        ecosort_system.components.database = database
+        
+        writer = asyncio.create_task(ecosort_system._db_writer_loop())
+        try:
+            for object_id in (1, 2):
+                result = ClassificationResult(
+                    object_id=object_id, classification_db_id=None, category_name="metal",
+                    category_index=0, confidence=0.9, processing_time_ms=10.0,
+                    detection_time=time.time()
+                )
+                ecosort_system._queue_classification_record(object_id, result)
+            
+            futures = [ecosort_system._pending_db_ids[i] for i in (1, 2)]
+            assert await asyncio.wait_for(asyncio.gather(*futures), timeout=2.0) == [10, 11]
+            database.record_classifications_bulk.assert_called_once()
+            assert len(database.record_classifications_bulk.call_args[0][0]) == 2
+        finally:
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+    
+    def test_bin_alerts_only_on_band_entry(self, ecosort_system):
+        """Test los niveles estables no se re-registran ni re-alertan"""
+        ecosort_system.components.database = Mock()
+        ecosort_system._event_log = Mock()
+        
+        for level in (85.0, 85.3, 85.6, 90.0):
+            ecosort_system._process_bin_level('metal_bin', level)
+        
+        # 85.3 y 85.6 no superan el epsilon; 90.0 sí, pero sigue en la misma banda
+        assert ecosort_system._event_log.update_bin_status.call_count == 2
+        ecosort_system._event_log.log_event.assert_called_once()
+    
+    def test_bin_read_limited_to_diverted_bins(self, ecosort_system):
+        """Test solo se leen las tolvas que recibieron objetos y tienen sensor"""
+        sensors = Mock()
+        sensors.bin_specific_configs = {'metal': {}, 'plastic': {}}
+        sensors.get_bin_fill_level.return_value = 40.0
+        ecosort_system._band_sensors = sensors
+        
+        levels = ecosort_system._read_bin_levels({'metal', 'other'})
+        
+        assert levels == {'metal': 40.0}
+        sensors.get_bin_fill_level.assert_called_once_with('metal')
+    
+    def test_classification_result_creation(self, frozen_time):
+        """Test creación de resultados de clasificación"""
+        result = ClassificationResult(
+            object_id=1,
+            classification_db_id=None,
+            category_name="metal",
+            category_index=0,
+            confidence=0.85,
+            processing_time_ms=150.0,
+            detection_time=time.time()
+        )
+        
+        assert result.object_id == 1
+        assert result.category_name == "metal"
+        assert result.confidence == 0.85
+        assert result.detection_time == frozen_time.now
+        assert not result.is_error
+    
+    @pytest.mark.parametrize("class_names, expected", [
+        (["metal", "plastic", "other"], "other"),
+        (["metal", "plastic", "Desconocido"], "Desconocido"),
+    ])
+    def test_fallback_category_selection(self, ecosort_system, class_names, expected):
+        """Test selección de categoría de fallback"""
+        assert ecosort_system._get_fallback_category(class_names) == expected
+    
+    def test_metrics_update(self, frozen_time, ecosort_system):
+        """Test actualización de métricas"""
+        # Simular algunos datos
+        ecosort_system.metrics.objects_processed = 10
+        ecosort_system.metrics.successful_classifications = 8
+        ecosort_system.metrics.diversions_attempted = 5
+        ecosort_system.metrics.diversions_successful = 4
+        ecosort_system._recent_times.extend([100.0, 200.0, 300.0])
+        frozen_time.advance(5.0)
+        
+        ecosort_system._update_metrics()
+        
+        assert ecosort_system.metrics.system_uptime == pytest.approx(5.0)
+        assert ecosort_system.metrics.average_processing_time_ms == pytest.approx(200.0)
+    
+    def test_status_report(self, ecosort_system):
+        """Test generación de reporte de estado"""
+        status = ecosort_system.get_status()
+        
+        assert _REQUIRED_STATUS_KEYS <= status.keys()
+        
+        assert isinstance(status['metrics'], dict)
+        assert isinstance(status['uptime_seconds'], (int, float))
+    
+    def test_status_counters_live_between_updates(self, ecosort_system):
+        """Test los contadores del estado no esperan a la actualización periódica"""
+        first = ecosort_system.get_status()
+        first['performance_summary']['mutated'] = True
+        ecosort_system.metrics.objects_processed += 3
+        
+        second = ecosort_system.get_status()
+        
+        assert second['metrics']['objects_processed'] == first['metrics']['objects_processed'] + 3
+        assert 'mutated' not in second['performance_summary']
+
+
+if __name__ == "__main__":
+    # Ejecutar tests con configuración específica
+    pytest.main([
+        __file__,
+        "-v",
+        "--tb=short",
+        "--asyncio-mode=auto",
+        "--color=yes"
+    ]) 
\ No newline at end of file